@@ -0,0 +1,4 @@
+"""
+Benchmarks for RingoBot.
+Run them from the src directory, e.g. ``python -m benchmarks.discape``.
+"""
@@ -0,0 +1,237 @@
+"""
+Discape benchmark.
+Plays scripted games on a synthetic workbook and reports latency per operation.
+
+Usage (from the src directory):
+    python -m benchmarks.discape --players 50 --rooms 5 --steps 200 --output bench.json
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import tempfile
+from dataclasses import asdict
+from typing import Any, Callable, Dict, List, Tuple
+
+from benchmarks.generator import STAT_NAMES, WorkbookSpec, generate_workbook
+from utils.config import config
+from utils.discape_model import COMBINATIONS_SHEET
+
+BACK = "↩️ Volver"
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    """Get a percentile of sorted samples using the nearest-rank method."""
+    if not samples:
+        return 0.0
+    rank = max(1, round(fraction * len(samples) + 0.5))
+    return samples[min(rank, len(samples)) - 1]
+
+
+class Timings:
+    """Latency samples grouped by operation."""
+
+    def __init__(self):
+        """Create an empty set of samples."""
+        self.samples: Dict[str, List[float]] = {}
+
+    def measure(self, operation: str, func: Callable[..., Any], *args) -> Any:
+        """Call a function and record how long it took."""
+        started = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            self.record(operation, time.perf_counter() - started)
+
+    def record(self, operation: str, elapsed: float) -> None:
+        """Record a latency sample in seconds."""
+        self.samples.setdefault(operation, []).append(elapsed)
+
+    def report(self) -> Dict[str, Dict[str, float]]:
+        """Get the throughput and latency percentiles of every operation."""
+        report = {}
+        for operation, samples in sorted(self.samples.items()):
+            samples = sorted(samples)
+            total = sum(samples)
+            report[operation] = {
+                "count": len(samples),
+                "ops_per_sec": len(samples) / total if total else 0.0,
+                "p50_ms": percentile(samples, 0.50) * 1000,
+                "p99_ms": percentile(samples, 0.99) * 1000,
+                "max_ms": samples[-1] * 1000,
+            }
+        return report
+
+
+def _recipes(wb) -> Dict[str, List[Tuple[str, str]]]:
+    """Get the item pairs of the generated recipes of each room."""
+    recipes: Dict[str, List[Tuple[str, str]]] = {}
+    for item1, item2, _, _, room in wb[COMBINATIONS_SHEET].iter_rows(
+        min_row=2, max_col=5, values_only=True
+    ):
+        recipes.setdefault(room, []).append((item1, item2))
+    return recipes
+
+
+def _type(timings: Timings, operation: str, search, player: int, text: str) -> None:
+    """Simulate autocomplete requests for the first keystrokes of a text."""
+    for length in range(min(len(text), 3) + 1):
+        timings.measure(operation, search, player, text[:length])
+
+
+def play(game, spec: WorkbookSpec, recipes, steps: int, timings: Timings) -> None:
+    """
+    Play scripted turns for every player of a game.
+
+    Each turn a player rejoins their room if they escaped, browses and takes
+    a path, equips an item, tries a recipe and rolls a stat, going through
+    the autocomplete helpers as a Discord client would.
+    """
+    rng = random.Random(spec.seed)
+    rooms = spec.room_names()
+    players = spec.player_ids()
+
+    for _ in range(steps):
+        for index, player in enumerate(players):
+            room = rooms[index % len(rooms)]
+            if game.get_player_location(player)[0] is None:
+                timings.measure("join_room", game.join_room, player, room)
+
+            zones = timings.measure("get_zones", game.get_zones, player)
+            _, path = game.get_player_location(player)
+            choices = zones + ([BACK] if path else [])
+            if choices:
+                choice = rng.choice(choices)
+                _type(
+                    timings,
+                    "autocomplete_investigate",
+                    game.search_investigation_options,
+                    player,
+                    choice,
+                )
+                timings.measure("take_path", game.take_path, player, choice)
+
+            items = game.get_equipable_items_for_player(player)
+            if items:
+                item = rng.choice(items)
+                _type(
+                    timings,
+                    "autocomplete_equip",
+                    game.search_equipable_items,
+                    player,
+                    item,
+                )
+                timings.measure("equip", game.equip, player, item)
+
+            room_recipes = recipes.get(game.get_player_location(player)[0])
+            if room_recipes:
+                item1, item2 = rng.choice(room_recipes)
+                timings.measure("combine", game.combine, item1, item2, room)
+
+            timings.measure("get_stat", game.get_stat, player, rng.choice(STAT_NAMES))
+
+
+def run(spec: WorkbookSpec, steps: int, storage: str) -> Dict[str, Any]:
+    """
+    Generate a workbook, play it and report the measured latencies.
+
+    Args:
+        spec: Size of the generated workbook
+        steps: Turns played by every player
+        storage: Discape storage engine ("sqlite" or "journal")
+
+    Returns:
+        JSON-serializable benchmark results
+    """
+    # Imported here so the configuration can be adjusted first
+    from modules.discape import DiscapeGame
+
+    with tempfile.TemporaryDirectory(prefix="discape-bench-") as directory:
+        config.DISCAPE_GAMES_DIR = directory
+        config.DISCAPE_STORAGE = storage
+        game_dir = os.path.join(directory, "bench")
+        os.makedirs(game_dir)
+        wb = generate_workbook(spec)
+        wb.save(os.path.join(game_dir, DiscapeGame.WORKBOOK_FILE))
+
+        timings = Timings()
+        started = time.perf_counter()
+        game = timings.measure("import", DiscapeGame, "bench")
+        try:
+            play(game, spec, _recipes(wb), steps, timings)
+        finally:
+            timings.measure("close", game.close)
+        elapsed = time.perf_counter() - started
+
+    operations = timings.report()
+    return {
+        "benchmark": "discape",
+        "spec": asdict(spec),
+        "steps": steps,
+        "storage": storage,
+        "elapsed_s": elapsed,
+        "total_ops": sum(op["count"] for op in operations.values()),
+        "operations": operations,
+    }
+
+
+def main() -> None:
+    """Run the benchmark from the command line."""
+    defaults = WorkbookSpec()
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--players", type=int, default=defaults.players)
+    parser.add_argument("--rooms", type=int, default=defaults.rooms)
+    parser.add_argument(
+        "--branching",
+        type=int,
+        default=defaults.branching,
+        help="attractions per depth",
+    )
+    parser.add_argument(
+        "--depth", type=int, default=defaults.depth, help="depth of each room"
+    )
+    parser.add_argument(
+        "--inventory",
+        type=int,
+        default=defaults.inventory,
+        help="initial items per room",
+    )
+    parser.add_argument(
+        "--recipes", type=int, default=defaults.recipes, help="recipes per room"
+    )
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument(
+        "--steps", type=int, default=50, help="turns played by every player"
+    )
+    parser.add_argument(
+        "--storage", choices=["sqlite", "journal"], default=config.DISCAPE_STORAGE
+    )
+    parser.add_argument("--output", help="write the JSON results to this file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    spec = WorkbookSpec(
+        players=args.players,
+        rooms=args.rooms,
+        branching=args.branching,
+        depth=args.depth,
+        inventory=args.inventory,
+        recipes=args.recipes,
+        seed=args.seed,
+    )
+    results = run(spec, args.steps, args.storage)
+
+    output = json.dumps(results, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        sys.stdout.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Synthetic escape room generator.
+Builds Discape workbooks of any size for benchmarks.
+"""
+
+import random
+import string
+from dataclasses import dataclass
+from typing import List
+from openpyxl import Workbook
+
+from utils.discape_model import (
+    CHARACTERS_HEADER,
+    CHARACTERS_SHEET,
+    COMBINATIONS_HEADER,
+    COMBINATIONS_SHEET,
+    FINAL,
+    INVENTORY_HEADER,
+    INVENTORY_SHEET,
+    OBJECT,
+    ROOM_HEADER,
+)
+
+STAT_NAMES = ["Fuerza", "Resistencia", "Agilidad", "Inteligencia", "Suerte"]
+# Snowflake-sized, like real Discord user IDs
+FIRST_PLAYER_ID = 100000000000000000
+
+
+@dataclass
+class WorkbookSpec:
+    """Size of a synthetic escape room workbook."""
+
+    players: int = 20
+    rooms: int = 4
+    branching: int = 3
+    depth: int = 3
+    inventory: int = 20
+    recipes: int = 50
+    seed: int = 0
+
+    def player_names(self) -> List[str]:
+        """Get the Discord names of the generated players."""
+        return [f"jugador{index}" for index in range(self.players)]
+
+    def player_ids(self) -> List[int]:
+        """Get the Discord user IDs of the generated players."""
+        return [FIRST_PLAYER_ID + index for index in range(self.players)]
+
+    def room_names(self) -> List[str]:
+        """Get the channel names of the generated rooms."""
+        return [f"sala-{index}" for index in range(self.rooms)]
+
+
+def _steps(branching: int) -> str:
+    """Get the path letters used for each branch."""
+    if branching > len(string.ascii_uppercase):
+        raise ValueError(f"At most {len(string.ascii_uppercase)} branches per depth")
+    return string.ascii_uppercase[:branching]
+
+
+def generate_workbook(spec: WorkbookSpec) -> Workbook:
+    """
+    Generate a valid escape room workbook.
+
+    Every room is a tree with ``branching`` passages per depth down to
+    ``depth`` steps. Each depth also holds an object that can be picked up,
+    the last passage of every depth is locked by an item of the room's
+    initial inventory, and the first leaf is the exit. Recipes combine pairs
+    of inventory items.
+
+    Args:
+        spec: Size of the workbook
+
+    Returns:
+        The generated openpyxl workbook
+    """
+    rng = random.Random(spec.seed)
+    steps = _steps(spec.branching)
+    rooms = spec.room_names()
+    wb = Workbook()
+
+    ws = wb.active
+    ws.title = CHARACTERS_SHEET
+    ws.append(CHARACTERS_HEADER + STAT_NAMES)
+    for index, player in enumerate(spec.player_ids()):
+        ws.append(
+            [f"Personaje {index}", str(player), None, None, None]
+            + [rng.randint(-2, 5) for _ in STAT_NAMES]
+        )
+
+    ws = wb.create_sheet(INVENTORY_SHEET)
+    ws.append(INVENTORY_HEADER)
+    for room in rooms:
+        for index in range(spec.inventory):
+            ws.append([f"Objeto {index}", f"Descripción del objeto {index}", room])
+
+    ws = wb.create_sheet(COMBINATIONS_SHEET)
+    ws.append(COMBINATIONS_HEADER)
+    for room in rooms:
+        for index in range(spec.recipes if spec.inventory > 1 else 0):
+            item1, item2 = rng.sample(range(spec.inventory), 2)
+            ws.append(
+                [
+                    f"Objeto {item1}",
+                    f"Objeto {item2}",
+                    f"Resultado {index}",
+                    f"Descripción del resultado {index}",
+                    room,
+                ]
+            )
+
+    for room in rooms:
+        ws = wb.create_sheet(room)
+        ws.append(ROOM_HEADER)
+        exit_placed = False
+        depths = [""]
+        for level in range(spec.depth + 1):
+            next_depths = []
+            for depth in depths:
+                if level == spec.depth:
+                    if not exit_placed:
+                        ws.append(["Salida", "La salida", depth or None, FINAL])
+                        exit_placed = True
+                    continue
+                for position, step in enumerate(steps):
+                    key = None
+                    if position == len(steps) - 1 and spec.inventory and len(steps) > 1:
+                        key = f"Objeto {rng.randrange(spec.inventory)}"
+                    ws.append(
+                        [
+                            f"Zona {depth}{step}",
+                            f"Llegas a la zona {depth}{step}",
+                            depth or None,
+                            step,
+                            key,
+                            f"Abres la zona {depth}{step}" if key else None,
+                        ]
+                    )
+                    next_depths.append(depth + step)
+                ws.append(
+                    [
+                        f"Hallazgo {depth}",
+                        f"Algo encontrado en {depth or 'la entrada'}",
+                        depth or None,
+                        OBJECT,
+                    ]
+                )
+            depths = next_depths
+
+    return wb
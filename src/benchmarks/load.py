@@ -0,0 +1,374 @@
+"""
+Discape load test.
+Simulates concurrent players sending slash commands to DiscapeModule without Discord.
+
+Usage (from the src directory):
+    python -m benchmarks.load --players 200 --rooms 10 --steps 20 --output load.json
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import logging
+import argparse
+import tempfile
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from benchmarks.discape import Timings, _recipes, percentile
+from benchmarks.generator import STAT_NAMES, WorkbookSpec, generate_workbook
+from utils.config import config
+
+GUILD_ID = 1
+
+
+@dataclass
+class FakeUser:
+    """Discord user with the attributes the Discape handlers read."""
+
+    id: int
+    name: str
+
+
+@dataclass
+class FakeChannel:
+    """Discord text channel of a room."""
+
+    name: str
+    category_id: Optional[int] = None
+
+
+@dataclass
+class FakeInteraction:
+    """Interaction behind a slash command."""
+
+    guild_id: Optional[int]
+    channel: FakeChannel
+    user: FakeUser
+
+
+class FakeFollowup:
+    """Webhook that counts the responses instead of sending them."""
+
+    def __init__(self, stats: "LoadStats"):
+        self.stats = stats
+
+    async def send(self, content: Any = None, **kwargs) -> None:
+        """Record a response, counting the error messages."""
+        self.stats.responses += 1
+        if isinstance(content, str) and content.startswith("Error"):
+            self.stats.errors += 1
+
+
+@dataclass
+class FakeContext:
+    """Application context of a slash command sent by a simulated player."""
+
+    interaction: FakeInteraction
+    followup: FakeFollowup
+
+    @property
+    def user(self) -> FakeUser:
+        return self.interaction.user
+
+    @property
+    def channel(self) -> FakeChannel:
+        return self.interaction.channel
+
+    async def defer(self, **kwargs) -> None:
+        """Acknowledge the command, as Discord requires within 3 seconds."""
+
+
+@dataclass
+class LoadStats:
+    """Responses sent by the handlers."""
+
+    responses: int = 0
+    errors: int = 0
+
+
+@dataclass
+class LoopLag:
+    """Event loop lag measured by a task that sleeps at a fixed interval."""
+
+    interval: float = 0.01
+    samples: List[float] = field(default_factory=list)
+
+    async def monitor(self) -> None:
+        """Record how late every wake-up is until cancelled."""
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, loop.time() - started - self.interval))
+
+    def report(self) -> Dict[str, float]:
+        """Get the lag percentiles in milliseconds."""
+        samples = sorted(self.samples)
+        return {
+            "samples": len(samples),
+            "p50_ms": percentile(samples, 0.50) * 1000,
+            "p99_ms": percentile(samples, 0.99) * 1000,
+            "max_ms": (samples[-1] if samples else 0.0) * 1000,
+        }
+
+
+async def _measure(timings: Timings, operation: str, command) -> Any:
+    """Await a command and record its latency."""
+    started = time.perf_counter()
+    try:
+        return await command
+    finally:
+        timings.record(operation, time.perf_counter() - started)
+
+
+async def simulate_player(
+    module,
+    player: FakeUser,
+    room: str,
+    recipes: List[Tuple[str, str]],
+    steps: int,
+    think_time: float,
+    timings: Timings,
+    stats: LoadStats,
+    rng: random.Random,
+) -> None:
+    """
+    Play a player's turns through the slash command handlers.
+
+    The player joins their room and then, every turn, investigates one of
+    the options offered by autocomplete, equips an item, tries a recipe and
+    rolls a stat, waiting up to ``think_time`` seconds between commands.
+    """
+
+    def ctx() -> FakeContext:
+        interaction = FakeInteraction(GUILD_ID, FakeChannel(room), player)
+        return FakeContext(interaction, FakeFollowup(stats))
+
+    async def think() -> None:
+        await asyncio.sleep(rng.uniform(0, think_time) if think_time else 0)
+
+    await _measure(timings, "join", module.handle_join_command(ctx()))
+    for _ in range(steps):
+        await think()
+        options = await _measure(
+            timings,
+            "autocomplete_investigate",
+            module.fetch_investigation_options(ctx().interaction),
+        )
+        if options:
+            choice = rng.choice(options)
+            await _measure(
+                timings, "investigate", module.handle_investigate_command(ctx(), choice)
+            )
+        else:
+            # Players who escaped have nothing to investigate until they rejoin
+            await _measure(timings, "join", module.handle_join_command(ctx()))
+
+        await think()
+        items = await _measure(
+            timings,
+            "autocomplete_equip",
+            module.fetch_equipable_items(ctx().interaction),
+        )
+        if items:
+            await _measure(
+                timings,
+                "equip",
+                module.handle_equip_command(ctx(), rng.choice(items)),
+            )
+
+        if recipes:
+            await think()
+            item1, item2 = rng.choice(recipes)
+            await _measure(
+                timings,
+                "combine",
+                module.handle_combine_command(ctx(), item1, item2),
+            )
+
+        await think()
+        await _measure(
+            timings,
+            "roll",
+            module.handle_stat_roll_command(ctx(), rng.choice(STAT_NAMES)),
+        )
+
+
+async def run(
+    spec: WorkbookSpec, steps: int, think_time: float, storage: str, workers: int
+) -> Dict[str, Any]:
+    """
+    Generate a workbook and play it with every player at the same time.
+
+    Args:
+        spec: Size of the generated workbook
+        steps: Turns played by every player
+        think_time: Maximum pause in seconds between a player's commands
+        storage: Discape storage engine ("sqlite" or "journal")
+        workers: Discape executor threads
+
+    Returns:
+        JSON-serializable load test results
+    """
+    with tempfile.TemporaryDirectory(prefix="discape-load-") as directory:
+        config.DISCAPE_GAMES_DIR = directory
+        config.DISCAPE_STORAGE = storage
+        config.DISCAPE_WORKERS = workers
+        config.DISCAPE_EXPORT_INTERVAL = 0
+        # Imported here so the configuration can be adjusted first
+        from modules.discape import DiscapeGame, DiscapeModule
+
+        game_dir = os.path.join(directory, str(GUILD_ID))
+        os.makedirs(game_dir)
+        wb = generate_workbook(spec)
+        wb.save(os.path.join(game_dir, DiscapeGame.WORKBOOK_FILE))
+        recipes = _recipes(wb)
+
+        module = DiscapeModule()
+        timings = Timings()
+        stats = LoadStats()
+        lag = LoopLag()
+        rooms = spec.room_names()
+        rng = random.Random(spec.seed)
+        try:
+            # Load the game first so the import is not counted as a command
+            started = time.perf_counter()
+            await module.fetch_investigation_options(
+                FakeInteraction(GUILD_ID, FakeChannel(rooms[0]), FakeUser(0, ""))
+            )
+            load_s = time.perf_counter() - started
+
+            monitor = asyncio.create_task(lag.monitor())
+            started = time.perf_counter()
+            await asyncio.gather(
+                *(
+                    simulate_player(
+                        module,
+                        player,
+                        rooms[index % len(rooms)],
+                        recipes.get(rooms[index % len(rooms)], []),
+                        steps,
+                        think_time,
+                        timings,
+                        stats,
+                        random.Random(rng.random()),
+                    )
+                    for index, player in enumerate(
+                        FakeUser(user_id, name)
+                        for user_id, name in zip(spec.player_ids(), spec.player_names())
+                    )
+                )
+            )
+            elapsed = time.perf_counter() - started
+            monitor.cancel()
+            metrics = module.metrics()
+        finally:
+            module.close()
+
+    operations = timings.report()
+    total_ops = sum(op["count"] for op in operations.values())
+    locks = metrics["room_locks"]
+    return {
+        "benchmark": "discape-load",
+        "spec": asdict(spec),
+        "steps": steps,
+        "think_time_s": think_time,
+        "storage": storage,
+        "workers": workers,
+        "load_s": load_s,
+        "elapsed_s": elapsed,
+        "total_ops": total_ops,
+        "throughput_ops_per_sec": total_ops / elapsed if elapsed else 0.0,
+        "responses": stats.responses,
+        "errors": stats.errors,
+        "operations": operations,
+        "room_locks": {
+            **locks,
+            "contention_ratio": (
+                locks["contended"] / locks["acquired"] if locks["acquired"] else 0.0
+            ),
+            "avg_wait_ms": (
+                locks["total_wait"] / locks["acquired"] * 1000
+                if locks["acquired"]
+                else 0.0
+            ),
+        },
+        "event_loop_lag": lag.report(),
+        "executor": {
+            key: metrics[key]
+            for key in ("queue_depth", "max_queue_depth", "operations")
+            if key in metrics
+        },
+        "autocomplete": metrics["autocomplete"],
+    }
+
+
+def main() -> None:
+    """Run the load test from the command line."""
+    defaults = WorkbookSpec(players=100, rooms=10)
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--players", type=int, default=defaults.players)
+    parser.add_argument("--rooms", type=int, default=defaults.rooms)
+    parser.add_argument(
+        "--branching",
+        type=int,
+        default=defaults.branching,
+        help="attractions per depth",
+    )
+    parser.add_argument(
+        "--depth", type=int, default=defaults.depth, help="depth of each room"
+    )
+    parser.add_argument(
+        "--inventory",
+        type=int,
+        default=defaults.inventory,
+        help="initial items per room",
+    )
+    parser.add_argument(
+        "--recipes", type=int, default=defaults.recipes, help="recipes per room"
+    )
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument(
+        "--steps", type=int, default=20, help="turns played by every player"
+    )
+    parser.add_argument(
+        "--think-ms",
+        type=float,
+        default=0,
+        help="maximum pause between a player's commands",
+    )
+    parser.add_argument(
+        "--storage", choices=["sqlite", "journal"], default=config.DISCAPE_STORAGE
+    )
+    parser.add_argument("--workers", type=int, default=config.DISCAPE_WORKERS)
+    parser.add_argument("--output", help="write the JSON results to this file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    spec = WorkbookSpec(
+        players=args.players,
+        rooms=args.rooms,
+        branching=args.branching,
+        depth=args.depth,
+        inventory=args.inventory,
+        recipes=args.recipes,
+        seed=args.seed,
+    )
+    results = asyncio.run(
+        run(spec, args.steps, args.think_ms / 1000, args.storage, args.workers)
+    )
+
+    output = json.dumps(results, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        sys.stdout.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
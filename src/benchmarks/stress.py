@@ -0,0 +1,223 @@
+"""
+Discape concurrency stress test.
+Fires concurrent pickups of the same object at one room and at many rooms.
+
+Every player of a room investigates the room's only object at the same time.
+The room locks must let exactly one of them take it, so each room must end
+with a single copy of the item, in memory and in storage after a restart.
+
+Usage (from the src directory):
+    python -m benchmarks.stress --players 200 --rooms 20 --output stress.json
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import logging
+import argparse
+import tempfile
+from typing import Any, Dict, List
+
+from benchmarks.generator import WorkbookSpec, generate_workbook
+from benchmarks.load import (
+    GUILD_ID,
+    FakeChannel,
+    FakeContext,
+    FakeFollowup,
+    FakeInteraction,
+    FakeUser,
+    LoadStats,
+)
+from utils.config import config
+
+TAKEN = "Has obtenido un nuevo objeto"
+
+
+class RecordingFollowup(FakeFollowup):
+    """Webhook that keeps the text responses."""
+
+    def __init__(self, stats: LoadStats):
+        super().__init__(stats)
+        self.messages: List[str] = []
+
+    async def send(self, content: Any = None, **kwargs) -> None:
+        """Record a response and its text."""
+        await super().send(content, **kwargs)
+        if isinstance(content, str):
+            self.messages.append(content)
+
+
+def _context(room: str, player: FakeUser, stats: LoadStats) -> FakeContext:
+    """Get the context of a command sent by a player in a room."""
+    interaction = FakeInteraction(GUILD_ID, FakeChannel(room), player)
+    return FakeContext(interaction, RecordingFollowup(stats))
+
+
+async def run_scenario(
+    name: str, players: int, rooms: int, storage: str, workers: int
+) -> Dict[str, Any]:
+    """
+    Race every player of each room to pick up the room's object.
+
+    Args:
+        name: Name of the scenario in the results
+        players: Players in total, spread evenly over the rooms
+        rooms: Rooms played at the same time
+        storage: Discape storage engine ("sqlite" or "journal")
+        workers: Discape executor threads
+
+    Returns:
+        JSON-serializable scenario results; ``passed`` is False if any room
+        did not end with exactly one copy of its object
+    """
+    # One object per room, at the entrance, and a single passage to the exit
+    spec = WorkbookSpec(
+        players=players, rooms=rooms, branching=1, depth=1, inventory=0, recipes=0
+    )
+    with tempfile.TemporaryDirectory(prefix="discape-stress-") as directory:
+        config.DISCAPE_GAMES_DIR = directory
+        config.DISCAPE_STORAGE = storage
+        config.DISCAPE_WORKERS = workers
+        config.DISCAPE_EXPORT_INTERVAL = 0
+        # Imported here so the configuration can be adjusted first
+        from modules.discape import DiscapeGame, DiscapeModule
+
+        game_dir = os.path.join(directory, str(GUILD_ID))
+        os.makedirs(game_dir)
+        generate_workbook(spec).save(os.path.join(game_dir, DiscapeGame.WORKBOOK_FILE))
+
+        room_names = spec.room_names()
+        seats = [
+            (room_names[index % rooms], FakeUser(user_id, name))
+            for index, (user_id, name) in enumerate(
+                zip(spec.player_ids(), spec.player_names())
+            )
+        ]
+        stats = LoadStats()
+
+        module = DiscapeModule()
+        try:
+            await asyncio.gather(
+                *(
+                    module.handle_join_command(_context(room, player, stats))
+                    for room, player in seats
+                )
+            )
+            # The object is the only option that is not a passage
+            objects = {}
+            for room in room_names:
+                options = await module.fetch_investigation_options(
+                    _context(room, seats[room_names.index(room)][1], stats).interaction
+                )
+                objects[room] = next(
+                    option for option in options if option.startswith("Hallazgo")
+                )
+
+            contexts = [(room, _context(room, player, stats)) for room, player in seats]
+            started = time.perf_counter()
+            await asyncio.gather(
+                *(
+                    module.handle_investigate_command(ctx, objects[room])
+                    for room, ctx in contexts
+                )
+            )
+            elapsed = time.perf_counter() - started
+
+            taken = {room: 0 for room in room_names}
+            for room, ctx in contexts:
+                taken[room] += sum(
+                    message.startswith(TAKEN) for message in ctx.followup.messages
+                )
+            game = module.games[str(GUILD_ID)]
+            in_memory = {
+                room: game.get_inventory_names(room).count(objects[room])
+                for room in room_names
+            }
+            metrics = module.metrics()
+        finally:
+            module.close()
+
+        # Reload the game from storage to check what was persisted
+        module = DiscapeModule()
+        try:
+            await module.fetch_investigation_options(
+                _context(room_names[0], seats[0][1], stats).interaction
+            )
+            game = module.games[str(GUILD_ID)]
+            stored = {
+                room: game.get_inventory_names(room).count(objects[room])
+                for room in room_names
+            }
+        finally:
+            module.close()
+
+    failures = [
+        room
+        for room in room_names
+        if (taken[room], in_memory[room], stored[room]) != (1, 1, 1)
+    ]
+    locks = metrics["room_locks"]
+    return {
+        "scenario": name,
+        "storage": storage,
+        "players": players,
+        "rooms": rooms,
+        "elapsed_s": elapsed,
+        "errors": stats.errors,
+        "room_locks": {
+            "acquired": locks["acquired"],
+            "contended": locks["contended"],
+        },
+        "failures": {
+            room: {
+                "taken": taken[room],
+                "in_memory": in_memory[room],
+                "stored": stored[room],
+            }
+            for room in failures
+        },
+        "passed": not failures and not stats.errors,
+    }
+
+
+async def run(players: int, rooms: int, workers: int) -> List[Dict[str, Any]]:
+    """Run the one-room and many-rooms scenarios with both storage engines."""
+    results = []
+    for storage in ("sqlite", "journal"):
+        results.append(await run_scenario("one-room", players, 1, storage, workers))
+        results.append(
+            await run_scenario("many-rooms", players, rooms, storage, workers)
+        )
+    return results
+
+
+def main() -> None:
+    """Run the stress test from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--players", type=int, default=100, help="players in each scenario"
+    )
+    parser.add_argument(
+        "--rooms", type=int, default=10, help="rooms of the many-rooms scenario"
+    )
+    parser.add_argument("--workers", type=int, default=config.DISCAPE_WORKERS)
+    parser.add_argument("--output", help="write the JSON results to this file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    results = asyncio.run(run(args.players, args.rooms, args.workers))
+
+    output = json.dumps(results, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        sys.stdout.write(output + "\n")
+    if not all(result["passed"] for result in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,7 @@ import sys
 from typing import Optional, List
 
 from utils.config import config
+from utils.autocomplete import MAX_CHOICES
 from modules.replies import RepliesModule
 from modules.dice import DiceModule
 from modules.music import MusicModule
@@ -60,6 +61,11 @@ class RingoBot:
         @self.bot.event
         async def on_ready():
             logger.info(f"¡{self.bot.user} se ha conectado!")
+            self.discape_module.start_export_schedule()
+            # Quests stored before user IDs were recorded only have a username
+            await self.quests_module.migrate_player_ids(
+                {member.name: member.id for member in self.bot.get_all_members()}
+            )
 
         @self.bot.event
         async def on_message(message: discord.Message):
@@ -81,6 +87,10 @@ class RingoBot:
             if reply:
                 await message.reply(reply, mention_author=True)
 
+        @self.bot.event
+        async def on_raw_reaction_add(payload: discord.RawReactionActionEvent):
+            await self.quests_module.handle_review_reaction(self.bot, payload)
+
         @self.bot.event
         async def on_reaction_add(reaction, user):
             if reaction.emoji == config.STAR_EMOJI and not user.bot:
@@ -147,6 +157,14 @@ class RingoBot:
             """Inicia una partida de sala de huida."""
             await self.discape_module.handle_start_command(ctx, archivo)
 
+        @escape.command(
+            name="exportar",
+            description="Exporta la partida de sala de huida a un archivo.",
+        )
+        async def exportar(ctx: discord.ApplicationContext):
+            """Exporta la partida de sala de huida a un archivo."""
+            await self.discape_module.handle_export_command(ctx)
+
         @escape.command(
             name="tirada",
             description="Tira un dado de 20 caras y suma tu bonificación de la característica elegida.",
@@ -161,13 +179,25 @@ class RingoBot:
             """Haz una tirada con una estadística."""
             await self.discape_module.handle_stat_roll_command(ctx, característica)
 
+        @escape.command(
+            name="tirada_sala",
+            description="Tira la característica elegida para todos los personajes de la sala.",
+        )
+        @discord.option(
+            "característica",
+            description="Característica a tirar.",
+            choices=["Fuerza", "Resistencia", "Agilidad", "Inteligencia", "Suerte"],
+            required=True,
+        )
+        async def tirada_sala(ctx: discord.ApplicationContext, característica: str):
+            """Haz una tirada con una estadística para toda la sala."""
+            await self.discape_module.handle_room_roll_command(ctx, característica)
+
         @escape.command(name="investigar", description="Investiga en la sala de huida.")
         @discord.option(
             "objetivo",
             description="¿Qué quieres investigar?",
-            autocomplete=discord.utils.basic_autocomplete(
-                self._get_investigation_options
-            ),
+            autocomplete=self._get_investigation_options,
             required=True,
         )
         async def investigar(ctx: discord.ApplicationContext, objetivo: str):
@@ -185,7 +215,7 @@ class RingoBot:
         @discord.option(
             "objeto",
             description="¿Qué objeto quieres equipar?",
-            autocomplete=discord.utils.basic_autocomplete(self._get_equipable_items),
+            autocomplete=self._get_equipable_items,
             required=True,
         )
         async def equipar(ctx: discord.ApplicationContext, objeto: str):
@@ -196,19 +226,29 @@ class RingoBot:
         @discord.option(
             "objeto1",
             description="¿Qué objeto quieres combinar?",
-            autocomplete=discord.utils.basic_autocomplete(self._get_equipable_items),
+            autocomplete=self._get_equipable_items,
             required=True,
         )
         @discord.option(
             "objeto2",
             description="¿Con qué objeto quieres combinarlo?",
-            autocomplete=discord.utils.basic_autocomplete(self._get_equipable_items),
+            autocomplete=self._get_equipable_items,
             required=True,
         )
         async def combinar(ctx: discord.ApplicationContext, objeto1: str, objeto2: str):
             """Combina dos objetos."""
             await self.discape_module.handle_combine_command(ctx, objeto1, objeto2)
 
+        @escape.command(name="responder", description="Responde a un puzle.")
+        @discord.option(
+            "respuesta",
+            description="Tu respuesta al puzle.",
+            required=True,
+        )
+        async def responder(ctx: discord.ApplicationContext, respuesta: str):
+            """Responde a un puzle."""
+            await self.discape_module.handle_answer_command(ctx, respuesta)
+
         @escape.command(
             name="unirse", description="Unirse a una partida de sala de huida."
         )
@@ -228,9 +268,7 @@ class RingoBot:
         @discord.option(
             "jugador",
             description="Jugador al que asignar la misión.",
-            autocomplete=discord.utils.basic_autocomplete(
-                self._get_pending_quest_users
-            ),
+            autocomplete=self._get_pending_quest_users,
             required=True,
         )
         @discord.option(
@@ -261,37 +299,65 @@ class RingoBot:
             """Completa una misión."""
             await self.quests_module.handle_complete_command(ctx, misión)
 
-    def _get_investigation_options(self, ctx: discord.AutocompleteContext) -> List[str]:
-        """Get autocomplete options for investigation command."""
+    async def _get_investigation_options(
+        self, ctx: discord.AutocompleteContext
+    ) -> List[str]:
+        """Get autocomplete options for investigation command.
+
+        The Discape module filters the options by the typed prefix itself,
+        so no ``basic_autocomplete`` wrapper is needed.
+        """
         try:
-            player_name = ctx.interaction.user.name
-            return self.discape_module.get_investigation_options(player_name)
+            return await self.discape_module.fetch_investigation_options(
+                ctx.interaction, ctx.value
+            )
         except Exception as e:
             logger.error(f"Error getting investigation options: {e}")
             return []
 
-    def _get_equipable_items(self, ctx: discord.AutocompleteContext) -> List[str]:
+    async def _get_equipable_items(self, ctx: discord.AutocompleteContext) -> List[str]:
         """Get autocomplete options for equipable items."""
         try:
-            player_name = ctx.interaction.user.name
-            return self.discape_module.get_equipable_items_for_player(player_name)
+            return await self.discape_module.fetch_equipable_items(
+                ctx.interaction, ctx.value
+            )
         except Exception as e:
             logger.error(f"Error getting equipable items: {e}")
             return []
 
-    def _get_quest_options(self, ctx: discord.AutocompleteContext) -> List[str]:
+    async def _get_quest_options(self, ctx: discord.AutocompleteContext) -> List[str]:
         """Get autocomplete options for active quests."""
         try:
-            player_name = ctx.interaction.user.name
-            return self.quests_module.get_quest_options_for_player(player_name)
+            player_id = ctx.interaction.user.id
+            return await self.quests_module.get_quest_options_for_player(player_id)
         except Exception as e:
             logger.error(f"Error getting quest options: {e}")
             return []
 
-    def _get_pending_quest_users(self, ctx: discord.AutocompleteContext) -> List[str]:
-        """Get autocomplete options for users with pending quest requests."""
+    async def _get_pending_quest_users(
+        self, ctx: discord.AutocompleteContext
+    ) -> List[discord.OptionChoice]:
+        """Get autocomplete options for users with pending quest requests.
+
+        Each option shows the user's current display name and carries their
+        ID, so only the offered users' names are resolved.
+        """
         try:
-            return self.quests_module.get_users_with_pending_requests()
+            prefix = (ctx.value or "").lower()
+            choices = []
+            for (
+                player_id,
+                player,
+            ) in await self.quests_module.get_users_with_pending_requests():
+                member = ctx.interaction.guild and ctx.interaction.guild.get_member(
+                    player_id
+                )
+                name = member.display_name if member else player
+                if name.lower().startswith(prefix):
+                    choices.append(
+                        discord.OptionChoice(name=name, value=str(player_id))
+                    )
+            return choices[:MAX_CHOICES]
         except Exception as e:
             logger.error(f"Error getting pending quest users: {e}")
             return []
@@ -304,3 +370,6 @@ class RingoBot:
         except Exception as e:
             logger.error(f"Failed to start bot: {e}")
             sys.exit(1)
+        finally:
+            self.discape_module.close()
+            self.quests_module.close()
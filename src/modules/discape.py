@@ -4,337 +4,478 @@ Discape module for escape room simulation functionality.
 
 import os
 import logging
+import time
+import asyncio
+import tempfile
 import threading
-from openpyxl import load_workbook
+from collections import OrderedDict
+from contextlib import AsyncExitStack, asynccontextmanager
 import discord
-from typing import List, Tuple, Dict, Optional
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    List,
+    Tuple,
+    Dict,
+    Optional,
+    Sequence,
+    TypeVar,
+)
 
 from utils.config import config
+from utils.executor import WorkerExecutor
+from utils.autocomplete import OptionsCache, PrefixIndex
+from utils.uploads import UploadTooLargeError, save_attachment
+from utils.discape_model import FINAL, OBJECT, PUZZLE, GameState, Item
+from utils.discape_store import DiscapeStore
+from utils.discape_journal import DiscapeJournal
+from utils.puzzles import PuzzleState, puzzle_registry
+from utils.discape_workbook import InvalidWorkbookError, compile_workbook
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+
+# Discord embed limits
+EMBED_MAX_FIELDS = 25
+EMBED_FIELD_NAME_LIMIT = 256
+EMBED_FIELD_VALUE_LIMIT = 1024
+EMBED_TOTAL_LIMIT = 6000
+# Characters left for the title and footer of a page
+EMBED_PAGE_BUDGET = EMBED_TOTAL_LIMIT - 500
+ITEMS_PER_PAGE = 10
+
+Page = Tuple[Tuple[str, str], ...]
+
+
+def _truncate(text: str, limit: int) -> str:
+    """Shorten a text to a length limit."""
+    return text if len(text) <= limit else text[: limit - 1] + "…"
+
+
+def paginate_fields(entries) -> Tuple[Page, ...]:
+    """
+    Pack (name, value) entries into pages of embed fields.
+
+    Each page holds up to ``ITEMS_PER_PAGE`` fields and stays within the
+    Discord limits for field and embed lengths.
+    """
+    pages: List[Page] = []
+    page: List[Tuple[str, str]] = []
+    size = 0
+    for name, value in entries:
+        name = _truncate(str(name), EMBED_FIELD_NAME_LIMIT)
+        value = _truncate(str(value or "\u200b"), EMBED_FIELD_VALUE_LIMIT)
+        length = len(name) + len(value)
+        if page and (
+            len(page) >= min(ITEMS_PER_PAGE, EMBED_MAX_FIELDS)
+            or size + length > EMBED_PAGE_BUDGET
+        ):
+            pages.append(tuple(page))
+            page, size = [], 0
+        page.append((name, value))
+        size += length
+    if page:
+        pages.append(tuple(page))
+    return tuple(pages)
+
 
 class PaginationView(discord.ui.View):
-    """Discord UI view for paginated content."""
+    """Discord UI view that renders pages of fields on demand."""
 
-    def __init__(self, embeds):
-        super().__init__()
-        self.embeds = embeds
+    def __init__(self, title: str, pages: Sequence[Page], timeout: float = 180):
+        super().__init__(timeout=timeout)
+        self.title = title
+        self.pages = pages
+        self.embeds: Dict[int, discord.Embed] = {}
         self.current = 0
 
+    def render(self, index: int) -> discord.Embed:
+        """Get the embed of a page, building it the first time it is shown."""
+        embed = self.embeds.get(index)
+        if embed is None:
+            embed = discord.Embed(title=self.title)
+            for name, value in self.pages[index]:
+                embed.add_field(name=name, value=value, inline=False)
+            embed.set_footer(text=f"Página {index + 1} de {len(self.pages)}")
+            self.embeds[index] = embed
+        return embed
+
     async def update_page(self, interaction: discord.Interaction):
         """Update the current page display."""
-        self.embeds[self.current].set_footer(
-            text=f"Página {self.current + 1} de {len(self.embeds)}"
-        )
-        await interaction.response.edit_message(embed=self.embeds[self.current])
+        await interaction.response.edit_message(embed=self.render(self.current))
 
     @discord.ui.button(label="⬅️", style=discord.ButtonStyle.blurple)
     async def previous_page(
         self, _: discord.ui.Button, interaction: discord.Interaction
     ):
         """Go to previous page."""
-        self.current = (self.current - 1) % len(self.embeds)
+        self.current = (self.current - 1) % len(self.pages)
         await self.update_page(interaction)
 
     @discord.ui.button(label="➡️", style=discord.ButtonStyle.blurple)
     async def next_page(self, _: discord.ui.Button, interaction: discord.Interaction):
         """Go to next page."""
-        self.current = (self.current + 1) % len(self.embeds)
+        self.current = (self.current + 1) % len(self.pages)
         await self.update_page(interaction)
 
-
-class DiscapeModule:
-    """Handles Discape escape room functionality."""
-
-    # Column indices for character sheet
-    CHAR_NAME_COL = 0
-    CHAR_USER_COL = 1
-    CHAR_ROOM_COL = 2
-    CHAR_PATH_COL = 3
-    CHAR_HAND_COL = 4
-
-    def __init__(self):
-        """Initialize the Discape module."""
-        self.wb = None
-        self.save_lock = threading.Lock()
-        self._load_workbook()
-
-    def _load_workbook(self):
-        """Load the Excel workbook for Discape data."""
+    async def on_timeout(self):
+        """Disable the buttons and drop the pages once the view expires."""
+        self.pages = ()
+        self.embeds.clear()
+        self.disable_all_items()
         try:
-            if os.path.exists(config.DISCAPE_FILE):
-                self.wb = load_workbook(filename=config.DISCAPE_FILE)
-                logger.info("Discape workbook loaded successfully")
-            else:
-                logger.warning(f"Discape file not found: {config.DISCAPE_FILE}")
-        except Exception as e:
-            logger.error(f"Error loading Discape workbook: {e}")
-
-    def get_column_values(self, sheet_name: str, column: int) -> List[str]:
-        """Get all values from a specific column in a sheet."""
-        if not self.wb:
-            return []
+            if self.message:
+                await self.message.edit(view=self)
+        except discord.HTTPException as e:
+            logger.debug(f"Could not disable expired pagination: {e}")
+        finally:
+            self.message = None
+
+
+class DiscapeGame:
+    """A Discape game with its own files, shared by one guild or category."""
+
+    WORKBOOK_FILE = "file.xlsx"
+    COMPILED_FILE = "compiled.pickle"
+    DB_FILE = "discape.db"
+    JOURNAL_DIR = "journal"
+
+    def __init__(self, key: str):
+        """
+        Open the game and load its stored state.
+
+        Args:
+            key: Key of the guild or category that plays the game
+        """
+        self.key = key
+        self.directory = os.path.join(config.DISCAPE_GAMES_DIR, key)
+        self.workbook_path = os.path.join(self.directory, self.WORKBOOK_FILE)
+        os.makedirs(self.directory, exist_ok=True)
+        self.state: Optional[GameState] = None
+        self.size = 0
+        self.users = 0
+        # Autocomplete options per (player, room, version)
+        self.options = OptionsCache()
+        self.versions: Dict[str, int] = {}
+        self.generation = 0
+        # Inventory pages of each room with the room version they show
+        self.inventory_pages: Dict[str, Tuple[Tuple[int, int], Tuple[Page, ...]]] = {}
+        # Puzzles being answered in each room
+        self.puzzles: Dict[str, PuzzleState] = {}
+        self.store = self._open_store()
+        self.store.on_rollback = self._reload
+        # Number of changes, and the number included in the last export
+        self.changes = 0
+        self.exported = 0
+        self._load_game()
+
+    def _open_store(self):
+        """Open the storage engine selected in the configuration."""
+        if config.DISCAPE_STORAGE == "journal":
+            return DiscapeJournal(
+                os.path.join(self.directory, self.JOURNAL_DIR),
+                config.DISCAPE_JOURNAL_FSYNC_INTERVAL,
+                config.DISCAPE_SNAPSHOT_EVERY,
+            )
+        return DiscapeStore(os.path.join(self.directory, self.DB_FILE))
 
+    def _load_game(self):
+        """Load the stored game, importing the workbook on first run."""
         try:
-            ws = self.wb[sheet_name]
-            return [row[column].value for row in ws]
+            self.state = self.store.load()
+            if self.state:
+                self.size = self.state.approximate_size()
+                logger.info(
+                    f"Discape game {self.key} loaded from {config.DISCAPE_STORAGE}"
+                )
+            elif os.path.exists(self.workbook_path) or self._claim_legacy_workbook():
+                self._import_workbook(self.workbook_path)
+            else:
+                logger.info(f"Discape game {self.key} has no workbook yet")
         except Exception as e:
-            logger.error(f"Error getting column values: {e}")
-            return []
+            logger.error(f"Error loading Discape game {self.key}: {e}")
 
-    def get_row_values(self, sheet_name: str, row: int) -> List[str]:
-        """Get all values from a specific row in a sheet."""
-        if not self.wb:
-            return []
+    def _reload(self) -> None:
+        """Reload the game from the store after a failed transaction.
 
+        Actions change the model alongside the store, so after a rollback the
+        in-memory game may hold changes the store discarded.
+        """
         try:
-            ws = self.wb[sheet_name]
-            return [cell.value for cell in ws[row]]
+            self.state = self.store.load()
         except Exception as e:
-            logger.error(f"Error getting row values: {e}")
-            return []
+            logger.error(f"Error reloading Discape game {self.key}: {e}")
+            self.state = None
+        self.puzzles.clear()
+        self.size = self.state.approximate_size() if self.state else 0
+        self._changed()
+        logger.warning(f"Reloaded Discape game {self.key} after a failed transaction")
+
+    def _claim_legacy_workbook(self) -> bool:
+        """Move the workbook of the single game of older versions into this game.
+
+        The file is moved, so only the first guild that plays after the
+        upgrade continues the old campaign.
+        """
+        if self.key == "dm" or not os.path.exists(config.DISCAPE_LEGACY_FILE):
+            return False
+        os.replace(config.DISCAPE_LEGACY_FILE, self.workbook_path)
+        logger.info(
+            f"Moved legacy Discape workbook {config.DISCAPE_LEGACY_FILE} "
+            f"to game {self.key}"
+        )
+        return True
+
+    def _import_workbook(self, path: str) -> None:
+        """Replace the current game with the one in an Excel workbook."""
+        state = compile_workbook(path, os.path.join(self.directory, self.COMPILED_FILE))
+        # Replace the stored and the in-memory game under the store's lock
+        with self.store.transaction():
+            self.store.import_state(state)
+            self.state = state
+        self.puzzles.clear()
+        self.size = state.approximate_size()
+        self._changed()
+        logger.info(f"Discape workbook {path} imported successfully")
+
+    def _changed(self, room: Optional[str] = None) -> None:
+        """Record a change to a room.
+
+        The room's version is bumped so that cached autocomplete options of
+        its players are rebuilt; without a room, every cached option is.
+        """
+        self.changes += 1
+        if room is None:
+            self.generation += 1
+        else:
+            self.versions[room] = self.versions.get(room, 0) + 1
+
+    def needs_export(self) -> bool:
+        """Check if the game changed since the workbook was last exported."""
+        return self.state is not None and self.changes != self.exported
+
+    def export_workbook(self) -> str:
+        """Write the current game to its workbook file and return the path."""
+        # Copy the game inside a transaction so no action is half-applied,
+        # and build the much slower workbook from the copy outside of it
+        with self.store.transaction():
+            changes = self.changes
+            data = self.state.to_dict()
+        wb = GameState.from_dict(data).to_workbook()
+        tmp_path = f"{self.workbook_path}.tmp"
+        wb.save(tmp_path)
+        os.replace(tmp_path, self.workbook_path)
+        self.exported = changes
+        logger.info(f"Exported Discape game {self.key} to {self.workbook_path}")
+        return self.workbook_path
+
+    def close(self) -> None:
+        """Close the store, exporting pending changes if exports are scheduled."""
+        if config.DISCAPE_EXPORT_INTERVAL and self.needs_export():
+            try:
+                self.export_workbook()
+            except Exception as e:
+                logger.error(f"Error exporting Discape game {self.key}: {e}")
+        self.store.close()
+
+    def needs_binding(self, player: int, name: str) -> bool:
+        """Check if a user plays a character that is still known by name only."""
+        if not self.state or player in self.state.players:
+            return False
+        character = self.state.characters.get(name)
+        return character is not None and character.player_id is None
+
+    def bind_player(self, player: int, name: str) -> None:
+        """Bind the character of the Jugador cell with a username to its user ID.
+
+        Characters imported with a username are migrated to the user's ID the
+        first time they play, so that renaming the account does not lose them.
+        """
+        # Checked under the store's lock, which an import also takes
+        with self.store.transaction("bind", player=player, name=name):
+            if not self.needs_binding(player, name):
+                return
+            character = self.state.characters[name]
+            self.state.bind_player(character, player)
+            self.store.update_character(character)
+        self._changed(character.room)
+        logger.info(f"Bound Discape character {character.name} to user {player}")
 
-    def get_player_location(self, player: str) -> Tuple[str, str]:
+    def get_player_location(self, player: int) -> Tuple[str, str]:
         """Get the current location of a player."""
-        if not self.wb:
+        if not self.state:
             return (None, None)
 
-        try:
-            ws = self.wb["Personajes"]
-            player_column_values = self.get_column_values(
-                "Personajes", self.CHAR_USER_COL
-            )
-            player_row = player_column_values.index(player)
-
-            room = ws.cell(row=player_row + 1, column=self.CHAR_ROOM_COL + 1).value
-            path = ws.cell(row=player_row + 1, column=self.CHAR_PATH_COL + 1).value
-
-            return (room, path)
-        except (ValueError, Exception) as e:
-            logger.error(f"Error getting player location: {e}")
+        character = self.state.character(player)
+        if not character:
             return (None, None)
 
-    def get_player_hand(self, player: str) -> Optional[str]:
+        return (character.room, character.path)
+
+    def get_player_hand(self, player: int) -> Optional[str]:
         """Get the item in player's hand."""
-        if not self.wb:
+        if not self.state:
             return None
 
-        try:
-            ws = self.wb["Personajes"]
-            player_column_values = self.get_column_values(
-                "Personajes", self.CHAR_USER_COL
-            )
-            player_row = player_column_values.index(player)
-
-            return ws.cell(row=player_row + 1, column=self.CHAR_HAND_COL + 1).value
-        except (ValueError, Exception) as e:
-            logger.error(f"Error getting player hand: {e}")
-            return None
+        character = self.state.character(player)
+        return character.hand if character else None
 
     def update_player_location(
-        self, player: str, location: str, path: Optional[str]
+        self, player: int, location: str, path: Optional[str]
     ) -> None:
         """Update player's location."""
-        if not self.wb:
+        if not self.state:
             return
 
         try:
-            ws = self.wb["Personajes"]
-            player_row = self.get_column_values("Personajes", self.CHAR_USER_COL).index(
-                player
-            )
-
-            ws.cell(row=player_row + 1, column=self.CHAR_ROOM_COL + 1, value=location)
+            character = self.state.character(player)
+            if not character:
+                return
 
-            if path == "":
-                ws.cell(row=player_row + 1, column=self.CHAR_PATH_COL + 1).value = None
-            else:
-                ws.cell(row=player_row + 1, column=self.CHAR_PATH_COL + 1, value=path)
+            with self.store.transaction("move", player=player):
+                character.room = location
+                character.path = path or None
+                self.store.update_character(character)
 
-            with self.save_lock:
-                self.wb.save(config.DISCAPE_FILE)
+            self._changed(location)
             logger.info(f"Updated player {player} location to {location}, path: {path}")
         except Exception as e:
             logger.error(f"Error updating player location: {e}")
 
     def get_inventory_dict(self, room: str) -> Dict[str, str]:
         """Get inventory items for a room as a dictionary."""
-        if not self.wb:
+        if not self.state:
             return {}
 
-        try:
-            ws = self.wb["Inventario"]
-            inventory = {}
-
-            for row in ws.iter_rows(min_row=2):
-                if (
-                    row[0].value is not None
-                    and row[1].value is not None
-                    and row[2].value == room
-                ):
-                    inventory[row[0].value] = row[1].value
-
-            return inventory
-        except Exception as e:
-            logger.error(f"Error getting inventory: {e}")
-            return {}
+        return {
+            item.name: item.description
+            for item in self.state.inventory(room)
+            if item.description is not None
+        }
+
+    def get_inventory_pages(self, room: str) -> Tuple[Page, ...]:
+        """Get the inventory of a room packed into embed pages.
+
+        The pages are rebuilt only when the room's version changes.
+        """
+        version = (self.generation, self.versions.get(room, 0))
+        cached = self.inventory_pages.get(room)
+        if cached is not None and cached[0] == version:
+            return cached[1]
 
-    def join_room(self, player: str, room: str) -> str:
+        pages = paginate_fields(self.get_inventory_dict(room).items())
+        self.inventory_pages[room] = (version, pages)
+        return pages
+
+    def join_room(self, player: int, room: str) -> str:
         """Add player to specified room."""
-        if not self.wb:
+        if not self.state:
             return "Error: No se pudo cargar el archivo de datos."
 
         try:
-            ws = self.wb["Personajes"]
-
-            for row in ws:
-                if row[self.CHAR_USER_COL].value == player:
-                    ws.cell(
-                        row=row[self.CHAR_NAME_COL].row,
-                        column=self.CHAR_ROOM_COL + 1,
-                        value=room,
-                    )
-                    break
+            character = self.state.character(player)
+            if character:
+                with self.store.transaction("join", player=player, room=room):
+                    character.room = room
+                    self.store.update_character(character)
 
-            with self.save_lock:
-                self.wb.save(config.DISCAPE_FILE)
+            self._changed(room)
             logger.info(f"Player {player} joined room {room}")
             return f"Te has unido a la sala: {room}."
         except Exception as e:
             logger.error(f"Error joining room: {e}")
             return "Error al unirse a la sala."
 
-    def get_stat(self, player: str, stat: str) -> int:
+    def get_stat(self, player: int, stat: str) -> int:
         """Get the value of the specified stat for the specified player."""
-        if not self.wb:
+        if not self.state:
             return 0
 
-        try:
-            ws = self.wb["Personajes"]
-            player_column_values = self.get_column_values(
-                "Personajes", self.CHAR_USER_COL
-            )
+        character = self.state.character(player)
+        if not character:
+            return 0
 
-            # Get the stat column numbers
-            stat_col = {}
-            for i in range(5, ws.max_column + 1):
-                stat_name = ws.cell(row=1, column=i).value
-                if stat_name:
-                    stat_col[stat_name] = i
+        return self.state.stat(character, stat)
 
-            if stat not in stat_col:
-                return 0
+    def get_room_stats(self, room: str, stat: str) -> List[Tuple[str, int]]:
+        """Get the specified stat of every character inside a room."""
+        if not self.state:
+            return []
 
-            player_row = player_column_values.index(player) + 1
-            return ws.cell(row=player_row, column=stat_col[stat]).value or 0
-        except (ValueError, Exception) as e:
-            logger.error(f"Error getting stat: {e}")
-            return 0
+        return self.state.room_stats(room, stat)
 
-    def get_zones(self, player: str) -> List[str]:
+    def get_zones(self, player: int) -> List[str]:
         """Get list of available zones for a player."""
-        if not self.wb:
+        if not self.state:
             return []
 
-        try:
-            room, path = self.get_player_location(player)
-            if not room:
-                return []
-
-            ws = self.wb[room]
-            zones = []
-
-            for row in ws:
-                if (
-                    row[2].value == path and row[4].value is None
-                ):  # depth_col and key_col
-                    zones.append(row[0].value)
-
-            return zones
-        except Exception as e:
-            logger.error(f"Error getting zones: {e}")
+        room, path = self.get_player_location(player)
+        graph = self.state.room(room) if room else None
+        if not graph:
             return []
 
+        return graph.visible_at(path)
+
     def get_inventory_names(self, room: str) -> List[str]:
         """Get list of item names in a room's inventory."""
-        if not self.wb:
+        if not self.state:
             return []
 
-        try:
-            ws = self.wb["Inventario"]
-            inventory = []
-
-            for row in ws:
-                if row[2].value == room and row[0].value:
-                    inventory.append(row[0].value)
-
-            return inventory
-        except Exception as e:
-            logger.error(f"Error getting inventory names: {e}")
-            return []
+        return [item.name for item in self.state.inventory(room)]
 
     def add_item(self, new_data: List[str]) -> None:
         """Add a new item to the inventory."""
-        if not self.wb:
+        if not self.state:
             return
 
         try:
-            ws = self.wb["Inventario"]
-            new_row = ws.max_row + 1
-            for i, value in enumerate(new_data):
-                ws.cell(row=new_row, column=i + 1, value=value)
-            with self.save_lock:
-                self.wb.save(config.DISCAPE_FILE)
+            self._add_item(new_data)
+            self._changed(new_data[2])
         except Exception as e:
             logger.error(f"Error adding item: {e}")
 
-    def _add_item_no_save(self, new_data: List[str]) -> None:
-        """Add a new item to the inventory without saving."""
-        if not self.wb:
-            return
-
-        try:
-            ws = self.wb["Inventario"]
-            new_row = ws.max_row + 1
-            for i, value in enumerate(new_data):
-                ws.cell(row=new_row, column=i + 1, value=value)
-        except Exception as e:
-            logger.error(f"Error adding item: {e}")
+    def _add_item(self, new_data: List[str]) -> None:
+        """Add a new item to the inventory and the database."""
+        name, description, room = new_data
+        item = Item(name, description, room)
+        with self.store.transaction():
+            self.store.add_item(item)
+            self.state.add_item(item)
 
     def remove_item(self, item: str, room: str) -> None:
         """Remove an item from the inventory."""
-        if not self.wb:
+        if not self.state:
             return
 
         try:
-            ws = self.wb["Inventario"]
-            for row in ws:
-                if row[0].value == item and row[2].value == room:
-                    ws.delete_rows(row[0].row)
-                    break
-            with self.save_lock:
-                self.wb.save(config.DISCAPE_FILE)
+            entry = self.state.find_item(room, item)
+            if entry:
+                self._remove_item(entry)
+            self._changed(room)
         except Exception as e:
             logger.error(f"Error removing item: {e}")
 
-    def equip(self, player: str, item: str) -> str:
+    def _remove_item(self, item: Item) -> None:
+        """Remove an item from the inventory and the database."""
+        with self.store.transaction():
+            self.store.remove_item(item)
+            self.state.remove_item(item)
+
+    def equip(self, player: int, item: str) -> str:
         """Equip a player with the specified item."""
-        if not self.wb:
+        if not self.state:
             return "Error: No se pudo cargar el archivo de datos."
 
         try:
-            room = self.get_player_location(player)[0]
-            if item in self.get_inventory_names(room):
-                ws = self.wb["Personajes"]
-                player_column_values = self.get_column_values(
-                    "Personajes", self.CHAR_USER_COL
-                )
-                player_row = player_column_values.index(player)
-
-                ws.cell(row=player_row + 1, column=self.CHAR_HAND_COL + 1, value=item)
-                with self.save_lock:
-                    self.wb.save(config.DISCAPE_FILE)
+            character = self.state.character(player)
+            if character and self.state.find_item(character.room, item):
+                with self.store.transaction("equip", player=player, item=item):
+                    character.hand = item
+                    self.store.update_character(character)
+                self._changed(character.room)
                 return f"Equipaste: {item}."
             else:
                 return "No tienes eso."
@@ -344,39 +485,32 @@ class DiscapeModule:
 
     def combine(self, item1: str, item2: str, room: str) -> str:
         """Combine two items and return the result."""
-        if not self.wb:
+        if not self.state:
             return "Error: No se pudo cargar el archivo de datos."
 
         try:
-            if item1 not in self.get_inventory_names(
-                room
-            ) or item2 not in self.get_inventory_names(room):
+            if not self.state.has_items(room, item1, item2):
                 return "No tienes esos objetos."
 
-            ws = self.wb["Combinaciones"]
-
-            for row in ws:
-                # Check both combinations (item1+item2 and item2+item1)
-                if (
-                    (row[0].value == item1 and row[1].value == item2)
-                    or (row[0].value == item2 and row[1].value == item1)
-                ) and row[4].value == room:
-
-                    # Add the resulting item
-                    self.add_item([row[2].value, row[3].value, room])
-                    # Remove the original items
-                    self.remove_item(item1, room)
-                    self.remove_item(item2, room)
-                    return "Has combinado los objetos y has obtenido un nuevo objeto."
-
-            return "No puedes combinar esos objetos."
+            # Recipes are indexed by unordered pair, so item2+item1 also matches
+            recipe = self.state.recipe(room, item1, item2)
+            if recipe is None:
+                return "No puedes combinar esos objetos."
+
+            with self.store.transaction("combine", room=room, items=[item1, item2]):
+                # Replace the original items with the resulting one
+                self._remove_item(self.state.find_item(room, item1))
+                self._remove_item(self.state.find_item(room, item2))
+                self._add_item([recipe.result, recipe.description, room])
+            self._changed(room)
+            return "Has combinado los objetos y has obtenido un nuevo objeto."
         except Exception as e:
             logger.error(f"Error combining items: {e}")
             return "Error al combinar objetos."
 
-    def take_path(self, player: str, choice: str) -> str:
+    def take_path(self, player: int, choice: str) -> str:
         """Navigate through the escape room or interact with objects."""
-        if not self.wb:
+        if not self.state:
             return "Error: No se pudo cargar el archivo de datos."
 
         try:
@@ -385,7 +519,9 @@ class DiscapeModule:
             if room is None:
                 return "No estás en ninguna sala."
 
-            ws = self.wb[room]
+            graph = self.state.room(room)
+            if graph is None:
+                return "No puedes ir por ahí."
             hand = self.get_player_hand(player)
 
             if choice == "↩️ Volver":
@@ -395,146 +531,159 @@ class DiscapeModule:
 
             # Check if player has item that can unlock something
             if hand:
-                if path:
-                    target_path = path + self.get_path_from_choice(player, choice)
-                else:
-                    target_path = self.get_path_from_choice(player, choice)
-
-                key = self.get_key_from_path(player, target_path)
-                if key == hand:
+                target_path = (path or "") + graph.path_of(choice)
+                if graph.key_at(target_path) == hand:
                     result = self.unlock_zone(player, hand)
                     if result:
                         return result
 
             # Process the choice
-            for row in ws:
-                if (
-                    row[2].value == path and row[0].value == choice
-                ):  # depth_col and name_col
-                    if row[3].value == "Final":  # path_col
-                        return self.escaped(room)
-                    elif row[3].value == "Objeto":
-                        return self.unlock_item(room, choice)
-                    elif row[3].value and row[3].value.startswith("Puzle"):
-                        puzzle_name = row[3].value.split(" ")[1]
-                        # Would need to import puzzles module here
-                        return f"Puzzle: {puzzle_name} (not implemented yet)"
-                    else:
-                        # Navigate to new location
-                        if path and row[3].value:
-                            new_path = path + row[3].value
-                        elif row[3].value:
-                            new_path = row[3].value
-                        else:
-                            new_path = path
-
-                        self.update_player_location(player, room, new_path)
-                        return row[1].value  # description
-
-            return "No puedes ir por ahí."
+            attraction = graph.find(path, choice)
+            if attraction is None:
+                return "No puedes ir por ahí."
+
+            if attraction.kind == FINAL:
+                return self.escaped(room)
+            elif attraction.kind == OBJECT:
+                return self.unlock_item(room, choice)
+            elif attraction.kind == PUZZLE:
+                return self.open_puzzle(player, room, attraction)
+            else:
+                # Navigate to new location
+                self.update_player_location(player, room, attraction.target)
+                return attraction.description
         except Exception as e:
             logger.error(f"Error taking path: {e}")
             return "Error al procesar la acción."
 
-    def get_path_from_choice(self, player: str, choice: str) -> str:
+    def get_path_from_choice(self, player: int, choice: str) -> str:
         """Get the path value for a choice."""
-        if not self.wb:
+        if not self.state:
             return ""
 
-        try:
-            room, _ = self.get_player_location(player)
-            ws = self.wb[room]
-
-            for row in ws:
-                if row[0].value == choice:  # name_col
-                    return row[3].value or ""  # path_col
-            return ""
-        except Exception as e:
-            logger.error(f"Error getting path from choice: {e}")
-            return ""
+        room, _ = self.get_player_location(player)
+        graph = self.state.room(room) if room else None
+        return graph.path_of(choice) if graph else ""
 
-    def get_key_from_path(self, player: str, path: str) -> str:
+    def get_key_from_path(self, player: int, path: str) -> str:
         """Get the key required for a path."""
-        if not self.wb:
+        if not self.state:
             return ""
 
-        try:
-            room, _ = self.get_player_location(player)
-            ws = self.wb[room]
-
-            for row in ws:
-                if row[2].value == path:  # depth_col
-                    return row[4].value or ""  # key_col
-            return ""
-        except Exception as e:
-            logger.error(f"Error getting key from path: {e}")
-            return ""
+        room, _ = self.get_player_location(player)
+        graph = self.state.room(room) if room else None
+        return graph.key_at(path) if graph else ""
 
-    def unlock_zone(self, player: str, item: str) -> str:
+    def unlock_zone(self, player: int, item: str) -> str:
         """Unlock a zone with an item."""
-        if not self.wb:
+        if not self.state:
             return ""
 
         try:
             room, path = self.get_player_location(player)
-            ws = self.wb[room]
-
-            for row in ws:
-                before = row[2].value[:-1] if row[2].value else None  # depth_col
-                if before == "":
-                    before = None
-
-                if row[4].value == item and path == before:  # key_col
-                    row[4].value = None
-                    self.update_player_location(player, room, row[2].value)
-                    with self.save_lock:
-                        self.wb.save(config.DISCAPE_FILE)
-                    return row[5].value or ""  # action_col
-            return ""
+            graph = self.state.room(room)
+
+            attraction = graph.locked_by(path, item)
+            if attraction is None:
+                return ""
+
+            with self.store.transaction("unlock", player=player, item=item):
+                graph.unlock(attraction)
+                self.store.update_attraction(attraction)
+                self.update_player_location(player, room, attraction.depth)
+            return attraction.action or ""
         except Exception as e:
             logger.error(f"Error unlocking zone: {e}")
             return ""
 
     def unlock_item(self, room: str, item: str) -> str:
         """Unlock an item in the room."""
-        if not self.wb:
+        if not self.state:
             return "Error: No se pudo cargar el archivo de datos."
 
         try:
-            ws = self.wb[room]
-            for row in ws:
-                if row[0].value == item:  # name_col
-                    self._add_item_no_save([item, row[1].value, room])
-                    ws.delete_rows(row[0].row)
-                    with self.save_lock:
-                        self.wb.save(config.DISCAPE_FILE)
-                    return f"Has obtenido un nuevo objeto: {item}."
-            return "No se pudo obtener el objeto."
+            graph = self.state.room(room)
+            attraction = graph.first_named(item)
+            if attraction is None:
+                return "No se pudo obtener el objeto."
+
+            with self.store.transaction("take", room=room, item=item):
+                self._add_item([item, attraction.description, room])
+                graph.remove(attraction)
+                self.store.remove_attraction(attraction)
+            self._changed(room)
+            return f"Has obtenido un nuevo objeto: {item}."
         except Exception as e:
             logger.error(f"Error unlocking item: {e}")
             return "Error al obtener el objeto."
 
+    def open_puzzle(self, player: int, room: str, attraction) -> str:
+        """Show a puzzle to a player, who can then answer it."""
+        puzzle = puzzle_registry.get(attraction.puzzle)
+        if puzzle is None:
+            return f"Puzle '{attraction.puzzle}' no encontrado."
+        if not puzzle.needs_answer:
+            return puzzle.prompt
+
+        self.puzzles.setdefault(room, PuzzleState()).open[player] = attraction
+        intro = f"{attraction.description}\n\n" if attraction.description else ""
+        return f"{intro}{puzzle.prompt}\n\nUsa `/escape responder` para resolverlo."
+
+    def answer_puzzle(self, player: int, answer: str) -> str:
+        """Answer the puzzle a player has open in their room."""
+        if not self.state:
+            return "Error: No se pudo cargar el archivo de datos."
+
+        try:
+            room, _ = self.get_player_location(player)
+            state = self.puzzles.get(room)
+            attraction = state.open.get(player) if state else None
+            if attraction is None or attraction.removed:
+                return "No tienes ningún puzle por resolver."
+
+            puzzle = puzzle_registry.get(attraction.puzzle)
+            state.attempts[attraction.name] += 1
+            if not puzzle.check(answer):
+                return "Respuesta incorrecta."
+
+            graph = self.state.room(room)
+            with self.store.transaction("solve", room=room, puzzle=attraction.name):
+                if puzzle.reward:
+                    self._add_item([*puzzle.reward, room])
+                graph.remove(attraction)
+                self.store.remove_attraction(attraction)
+            # Nobody else in the room needs to answer it anymore
+            for other, opened in list(state.open.items()):
+                if opened is attraction:
+                    del state.open[other]
+            self._changed(room)
+
+            result = attraction.action or puzzle.success
+            if puzzle.reward:
+                result += f"\nHas obtenido un nuevo objeto: {puzzle.reward[0]}."
+            return result
+        except Exception as e:
+            logger.error(f"Error answering puzzle: {e}")
+            return "Error al resolver el puzle."
+
     def escaped(self, room: str) -> str:
         """Handle player escaping from the room."""
-        if not self.wb:
+        if not self.state:
             return "Error: No se pudo cargar el archivo de datos."
 
         try:
-            ws = self.wb["Personajes"]
-            for row in ws:
-                if row[self.CHAR_ROOM_COL].value == room:
-                    ws.cell(
-                        row=row[self.CHAR_NAME_COL].row, column=self.CHAR_ROOM_COL + 1
-                    ).value = None
-
-            with self.save_lock:
-                self.wb.save(config.DISCAPE_FILE)
+            with self.store.transaction("escape", room=room):
+                for character in self.state.players_in(room):
+                    character.room = None
+                    self.store.update_character(character)
+
+            self._changed(room)
             return "**Has escapado.**"
         except Exception as e:
             logger.error(f"Error handling escape: {e}")
             return "Error al escapar."
 
-    def get_investigation_options(self, player: str) -> List[str]:
+    def get_investigation_options(self, player: int) -> List[str]:
         """Get available investigation options for a player."""
         try:
             room, path = self.get_player_location(player)
@@ -550,7 +699,7 @@ class DiscapeModule:
             logger.error(f"Error getting investigation options: {e}")
             return []
 
-    def get_equipable_items_for_player(self, player: str) -> List[str]:
+    def get_equipable_items_for_player(self, player: int) -> List[str]:
         """Get list of items that a player can equip."""
         try:
             room, _ = self.get_player_location(player)
@@ -562,31 +711,359 @@ class DiscapeModule:
             logger.error(f"Error getting equipable items: {e}")
             return []
 
+    def search_investigation_options(self, player: int, prefix: str) -> List[str]:
+        """Get the investigation options of a player starting with a prefix."""
+        return self._cached_options(
+            "investigate", self.get_investigation_options, player
+        ).search(prefix)
+
+    def search_equipable_items(self, player: int, prefix: str) -> List[str]:
+        """Get the items a player can equip starting with a prefix."""
+        return self._cached_options(
+            "equip", self.get_equipable_items_for_player, player
+        ).search(prefix)
+
+    def _cached_options(
+        self, kind: str, build: Callable[[int], List[str]], player: int
+    ) -> PrefixIndex:
+        """Get a player's options for the current version of their room."""
+        room, _ = self.get_player_location(player)
+        key = (kind, player, room, self.generation, self.versions.get(room, 0))
+        return self.options.get(key, lambda: build(player))
+
+
+class DiscapeModule:
+    """Handles Discape escape room functionality.
+
+    Every guild (or category, with ``DISCAPE_GAME_SCOPE=category``) plays its
+    own game. Games are loaded on their first command and the least recently
+    used idle ones are flushed and closed once the loaded games exceed
+    ``DISCAPE_MEMORY_BUDGET_MB``.
+    """
+
+    def __init__(self):
+        """Initialize the Discape module."""
+        self.games: "OrderedDict[str, DiscapeGame]" = OrderedDict()
+        self.memory_budget = int(config.DISCAPE_MEMORY_BUDGET_MB * 1024 * 1024)
+        self.game_stats = {"loads": 0, "evictions": 0}
+        # Guards the loaded games. Games are loaded and closed outside of it,
+        # registered in _pending so that their checkouts wait and a game is
+        # never open twice. Pins are counted under their own lock.
+        self._games_lock = threading.Lock()
+        self._pins_lock = threading.Lock()
+        self._pending: Dict[str, threading.Event] = {}
+        self.room_locks: Dict[Tuple[str, str], asyncio.Lock] = {}
+        # Games whose workbook is being imported; their room actions wait
+        self.imports: Dict[str, asyncio.Event] = {}
+        self.lock_stats = {"acquired": 0, "contended": 0, "total_wait": 0.0}
+        self.executor = WorkerExecutor("discape", config.DISCAPE_WORKERS)
+        # Workbook exports are slow, so they never take a gameplay worker
+        self.exporter = WorkerExecutor("discape-export", slow_threshold=5.0)
+        self._export_task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def game_key(interaction: discord.Interaction) -> str:
+        """Get the key of the game played where an interaction happened."""
+        if interaction.guild_id is None:
+            return "dm"
+        if config.DISCAPE_GAME_SCOPE == "category":
+            category_id = getattr(interaction.channel, "category_id", None)
+            if category_id:
+                return f"{interaction.guild_id}-{category_id}"
+        return str(interaction.guild_id)
+
+    def _checkout(self, key: str) -> DiscapeGame:
+        """Get a game, loading it if needed, and pin it until it is released.
+
+        Games are loaded outside ``_games_lock``, so a slow load only holds
+        up the commands of its own game.
+        """
+        while True:
+            with self._games_lock:
+                game = self.games.get(key)
+                if game is not None:
+                    self.games.move_to_end(key)
+                    with self._pins_lock:
+                        game.users += 1
+                    break
+                pending = self._pending.get(key)
+                if pending is None:
+                    loaded = self._pending[key] = threading.Event()
+            if pending is not None:
+                # Being loaded or closed by another thread; check again after
+                pending.wait()
+                continue
+
+            try:
+                game = DiscapeGame(key)
+            finally:
+                with self._games_lock:
+                    del self._pending[key]
+                    if game is not None:
+                        self.games[key] = game
+                        self.game_stats["loads"] += 1
+                        with self._pins_lock:
+                            game.users += 1
+                loaded.set()
+            break
+        self._evict()
+        return game
+
+    def _release(self, game: DiscapeGame) -> None:
+        """Unpin a game so that it can be evicted."""
+        with self._pins_lock:
+            game.users -= 1
+
+    def _evict(self) -> None:
+        """Close least recently used idle games until the memory budget is met."""
+        while True:
+            with self._games_lock:
+                if sum(game.size for game in self.games.values()) <= self.memory_budget:
+                    return
+                with self._pins_lock:
+                    victim = next(
+                        (game for game in self.games.values() if not game.users), None
+                    )
+                if victim is None:
+                    return
+                # Checkouts of the game wait until it is closed, so its files
+                # are never open twice
+                del self.games[victim.key]
+                closed = self._pending[victim.key] = threading.Event()
+
+            try:
+                victim.close()
+            finally:
+                with self._games_lock:
+                    del self._pending[victim.key]
+                    self.game_stats["evictions"] += 1
+                closed.set()
+            logger.info(f"Evicted Discape game {victim.key}")
+
+    @asynccontextmanager
+    async def _game(
+        self, interaction: discord.Interaction
+    ) -> AsyncIterator[DiscapeGame]:
+        """Use the game played where an interaction happened."""
+        game = await self._call(self._checkout, self.game_key(interaction))
+        try:
+            user = interaction.user
+            if game.needs_binding(user.id, user.name):
+                await self._call(game.bind_player, user.id, user.name)
+            yield game
+        finally:
+            self._release(game)
+
+    async def _import_in_game(self, game: DiscapeGame, path: str) -> None:
+        """Import a workbook while no room action of the game is running.
+
+        New room actions of the game wait for the import, and the import
+        takes every room lock of the game, so no action can look up the old
+        game and write to the new one.
+        """
+        while game.key in self.imports:
+            await self.imports[game.key].wait()
+        done = self.imports[game.key] = asyncio.Event()
+        try:
+            async with AsyncExitStack() as stack:
+                for (key, _), lock in list(self.room_locks.items()):
+                    if key == game.key:
+                        await stack.enter_async_context(lock)
+                await self._call(self._import_workbook, game, path)
+        finally:
+            del self.imports[game.key]
+            done.set()
+
+    def _import_workbook(self, game: DiscapeGame, path: str) -> None:
+        """Import a workbook into a game and keep the loaded games in budget."""
+        game._import_workbook(path)
+        self._evict()
+
+    def start_export_schedule(self) -> None:
+        """Start exporting changed games every ``DISCAPE_EXPORT_INTERVAL``."""
+        if not config.DISCAPE_EXPORT_INTERVAL or self._export_task:
+            return
+        self._export_task = asyncio.create_task(self._export_schedule())
+
+    async def _export_schedule(self) -> None:
+        """Export the loaded games that changed, periodically."""
+        while True:
+            await asyncio.sleep(config.DISCAPE_EXPORT_INTERVAL)
+            try:
+                await self.exporter.run(self._export_changed_games)
+            except Exception as e:
+                logger.error(f"Error in scheduled Discape export: {e}")
+
+    def _export_changed_games(self) -> None:
+        """Export every loaded game that changed since its last export."""
+        with self._games_lock, self._pins_lock:
+            games = list(self.games.values())
+            for game in games:
+                game.users += 1
+        try:
+            for game in games:
+                if game.needs_export():
+                    game.export_workbook()
+        finally:
+            for game in games:
+                self._release(game)
+
+    def close(self) -> None:
+        """Finish queued operations and close every game."""
+        if self._export_task:
+            self._export_task.cancel()
+        self.executor.shutdown()
+        self.exporter.shutdown()
+        with self._games_lock:
+            for game in self.games.values():
+                game.close()
+        logger.info(f"Discape executor metrics: {self.metrics()}")
+
+    async def _call(self, func: Callable[..., T], *args) -> T:
+        """Run a synchronous Discape operation on the Discape executor."""
+        return await self.executor.run(func, *args)
+
+    async def _call_in_room(
+        self, game: DiscapeGame, room: str, func: Callable[..., T], *args
+    ) -> T:
+        """Run a Discape operation on the executor while holding the room's lock.
+
+        Actions in the same room are linearized, while rooms run in parallel
+        on the executor's worker threads.
+        """
+        started = time.perf_counter()
+        while game.key in self.imports:
+            await self.imports[game.key].wait()
+        lock = self.room_locks.setdefault((game.key, room), asyncio.Lock())
+        contended = lock.locked()
+        async with lock:
+            self.lock_stats["acquired"] += 1
+            self.lock_stats["contended"] += contended
+            self.lock_stats["total_wait"] += time.perf_counter() - started
+            return await self._call(func, *args)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Get executor latency, room lock waits, loaded games and caches."""
+        options = [game.options.metrics() for game in list(self.games.values())]
+        return {
+            **self.executor.metrics(),
+            "room_locks": dict(self.lock_stats),
+            "games": {
+                **self.game_stats,
+                "loaded": len(self.games),
+                "memory": sum(game.size for game in self.games.values()),
+            },
+            "autocomplete": {
+                "hits": sum(cache["hits"] for cache in options),
+                "misses": sum(cache["misses"] for cache in options),
+            },
+        }
+
+    # Async facade for the bot
+    async def fetch_investigation_options(
+        self, interaction: discord.Interaction, prefix: str = ""
+    ) -> List[str]:
+        """Get the investigation options of the user of an interaction."""
+        async with self._game(interaction) as game:
+            return await self._call(
+                game.search_investigation_options, interaction.user.id, prefix
+            )
+
+    async def fetch_equipable_items(
+        self, interaction: discord.Interaction, prefix: str = ""
+    ) -> List[str]:
+        """Get the items the user of an interaction can equip."""
+        async with self._game(interaction) as game:
+            return await self._call(
+                game.search_equipable_items, interaction.user.id, prefix
+            )
+
     # Command handler methods
     async def handle_start_command(self, ctx, archivo):
         """Handle the start escape room command."""
         try:
             await ctx.defer()
 
-            # Save the uploaded file
-            await archivo.save(config.DISCAPE_FILE)
-
-            # Reload the workbook
-            self._load_workbook()
+            async with self._game(ctx.interaction) as game:
+                # Stream the upload to a temporary file; the game is only
+                # replaced once the workbook has been parsed and validated
+                fd, upload_path = tempfile.mkstemp(
+                    suffix=".xlsx", prefix="upload-", dir=game.directory
+                )
+                os.close(fd)
+                try:
+                    await save_attachment(
+                        archivo, upload_path, config.DISCAPE_MAX_UPLOAD_BYTES
+                    )
+                    await self._import_in_game(game, upload_path)
+                finally:
+                    if os.path.exists(upload_path):
+                        os.remove(upload_path)
 
             await ctx.followup.send("Archivo cargado.")
 
+        except UploadTooLargeError as e:
+            await ctx.followup.send(
+                f"El archivo es demasiado grande (máximo "
+                f"{e.max_bytes // (1024 * 1024)} MB).",
+                ephemeral=True,
+            )
+
+        except InvalidWorkbookError as e:
+            logger.warning(f"Rejected Discape workbook: {e}")
+            errors = "\n".join(f"- {error}" for error in e.errors[:10])
+            if len(e.errors) > 10:
+                errors += f"\n- Y {len(e.errors) - 10} errores más."
+            await ctx.followup.send(
+                f"El archivo no es válido:\n{errors}", ephemeral=True
+            )
         except Exception as e:
             logger.error(f"Error in start command: {e}")
             await ctx.followup.send("Error al cargar el archivo.", ephemeral=True)
 
+    async def handle_export_command(self, ctx):
+        """Handle the export escape room command."""
+        try:
+            await ctx.defer(ephemeral=True)
+
+            # Only server members have permissions; the "dm" game has no admin
+            if ctx.guild is None:
+                await ctx.followup.send(
+                    "La partida solo se puede exportar desde un servidor.",
+                    ephemeral=True,
+                )
+                return
+
+            if not ctx.author.guild_permissions.administrator:
+                await ctx.followup.send(
+                    "Solo un administrador puede exportar la partida.", ephemeral=True
+                )
+                return
+
+            async with self._game(ctx.interaction) as game:
+                if not game.state:
+                    await ctx.followup.send(
+                        "No hay ninguna partida cargada.", ephemeral=True
+                    )
+                    return
+
+                path = await self.exporter.run(game.export_workbook)
+                await ctx.followup.send(
+                    "Partida exportada.", file=discord.File(path), ephemeral=True
+                )
+
+        except Exception as e:
+            logger.error(f"Error in export command: {e}")
+            await ctx.followup.send("Error al exportar la partida.", ephemeral=True)
+
     async def handle_stat_roll_command(self, ctx, característica: str):
         """Handle the stat roll command."""
         try:
             await ctx.defer()
 
-            player = ctx.user.name
-            bonus = self.get_stat(player, característica)
+            player = ctx.user.id
+            async with self._game(ctx.interaction) as game:
+                bonus = await self._call(game.get_stat, player, característica)
 
             import random
 
@@ -603,22 +1080,53 @@ class DiscapeModule:
             logger.error(f"Error in stat roll command: {e}")
             await ctx.followup.send("Error al hacer la tirada.", ephemeral=True)
 
-    async def handle_investigate_command(self, ctx, objetivo: str):
-        """Handle the investigate command."""
+    async def handle_room_roll_command(self, ctx, característica: str):
+        """Handle the stat roll command for every character in the room."""
         try:
             await ctx.defer()
 
-            player = ctx.user.name
-            room, path = self.get_player_location(player)
+            room = ctx.channel.name
+            async with self._game(ctx.interaction) as game:
+                bonuses = await self._call(game.get_room_stats, room, característica)
 
-            if not room:
+            if not bonuses:
                 await ctx.followup.send(
-                    "No estás en ninguna sala de escape.", ephemeral=True
+                    "No hay ningún personaje en esta sala.", ephemeral=True
                 )
                 return
 
-            # Use the take_path method to handle the investigation
-            response = self.take_path(player, objetivo)
+            import random
+
+            lines = [f"¡Tirada de {característica} para toda la sala!"]
+            for name, bonus in bonuses:
+                roll = random.randint(1, 20)
+                lines.append(f"{name}: `[{roll}] + {bonus}` = **{roll + bonus}**")
+
+            await ctx.followup.send("\n".join(lines))
+
+        except Exception as e:
+            logger.error(f"Error in room roll command: {e}")
+            await ctx.followup.send("Error al hacer la tirada.", ephemeral=True)
+
+    async def handle_investigate_command(self, ctx, objetivo: str):
+        """Handle the investigate command."""
+        try:
+            await ctx.defer()
+
+            player = ctx.user.id
+            async with self._game(ctx.interaction) as game:
+                room, path = await self._call(game.get_player_location, player)
+
+                if not room:
+                    await ctx.followup.send(
+                        "No estás en ninguna sala de escape.", ephemeral=True
+                    )
+                    return
+
+                # Use the take_path method to handle the investigation
+                response = await self._call_in_room(
+                    game, room, game.take_path, player, objetivo
+                )
             await ctx.followup.send(response)
 
         except Exception as e:
@@ -630,31 +1138,24 @@ class DiscapeModule:
         try:
             await ctx.defer()
 
-            player = ctx.user.name
-            room, _ = self.get_player_location(player)
+            player = ctx.user.id
+            async with self._game(ctx.interaction) as game:
+                room, _ = await self._call(game.get_player_location, player)
 
-            if not room:
-                await ctx.followup.send(
-                    "No estás en ninguna sala de escape.", ephemeral=True
-                )
-                return
+                if not room:
+                    await ctx.followup.send(
+                        "No estás en ninguna sala de escape.", ephemeral=True
+                    )
+                    return
 
-            inventory = self.get_inventory_dict(room)
+                pages = await self._call(game.get_inventory_pages, room)
 
-            if not inventory:
+            if not pages:
                 await ctx.followup.send("No tienes ningún objeto.", ephemeral=True)
                 return
 
-            embeds = []
-            for item_name, item_desc in inventory.items():
-                embed = discord.Embed(title=item_name, description=item_desc)
-                embeds.append(embed)
-
-            if embeds:
-                view = PaginationView(embeds)
-                await ctx.followup.send(embed=embeds[0], view=view, ephemeral=True)
-            else:
-                await ctx.followup.send("No tienes ningún objeto.", ephemeral=True)
+            view = PaginationView("Inventario", pages)
+            await ctx.followup.send(embed=view.render(0), view=view, ephemeral=True)
 
         except Exception as e:
             logger.error(f"Error in inventory command: {e}")
@@ -665,8 +1166,16 @@ class DiscapeModule:
         try:
             await ctx.defer()
 
-            player = ctx.user.name
-            response = self.equip(player, objeto)
+            player = ctx.user.id
+            async with self._game(ctx.interaction) as game:
+                room, _ = await self._call(game.get_player_location, player)
+                if not room:
+                    await ctx.followup.send("No tienes eso.")
+                    return
+
+                response = await self._call_in_room(
+                    game, room, game.equip, player, objeto
+                )
             await ctx.followup.send(response)
 
         except Exception as e:
@@ -678,39 +1187,69 @@ class DiscapeModule:
         try:
             await ctx.defer()
 
-            player = ctx.user.name
-            room, _ = self.get_player_location(player)
+            player = ctx.user.id
+            async with self._game(ctx.interaction) as game:
+                room, _ = await self._call(game.get_player_location, player)
 
-            if not room:
-                await ctx.followup.send(
-                    "No estás en ninguna sala de escape.", ephemeral=True
-                )
-                return
+                if not room:
+                    await ctx.followup.send(
+                        "No estás en ninguna sala de escape.", ephemeral=True
+                    )
+                    return
 
-            response = self.combine(objeto1, objeto2, room)
+                response = await self._call_in_room(
+                    game, room, game.combine, objeto1, objeto2, room
+                )
             await ctx.followup.send(response)
 
         except Exception as e:
             logger.error(f"Error in combine command: {e}")
             await ctx.followup.send("Error al combinar objetos.", ephemeral=True)
 
+    async def handle_answer_command(self, ctx, respuesta: str):
+        """Handle the answer command."""
+        try:
+            await ctx.defer()
+
+            player = ctx.user.id
+            async with self._game(ctx.interaction) as game:
+                room, _ = await self._call(game.get_player_location, player)
+
+                if not room:
+                    await ctx.followup.send(
+                        "No estás en ninguna sala de escape.", ephemeral=True
+                    )
+                    return
+
+                response = await self._call_in_room(
+                    game, room, game.answer_puzzle, player, respuesta
+                )
+            await ctx.followup.send(response)
+
+        except Exception as e:
+            logger.error(f"Error in answer command: {e}")
+            await ctx.followup.send("Error al resolver el puzle.", ephemeral=True)
+
     async def handle_join_command(self, ctx):
         """Handle the join command."""
         try:
             await ctx.defer()
 
-            player = ctx.user.name
-            room, _ = self.get_player_location(player)
+            player = ctx.user.id
+            async with self._game(ctx.interaction) as game:
+                room, _ = await self._call(game.get_player_location, player)
 
-            if room:
-                await ctx.followup.send(
-                    "Aún no has escapado de la sala de huida en la que estás.",
-                    ephemeral=True,
-                )
-                return
+                if room:
+                    await ctx.followup.send(
+                        "Aún no has escapado de la sala de huida en la que estás.",
+                        ephemeral=True,
+                    )
+                    return
 
-            channel_name = ctx.channel.name
-            response = self.join_room(player, channel_name)
+                channel_name = ctx.channel.name
+                response = await self._call_in_room(
+                    game, channel_name, game.join_room, player, channel_name
+                )
             await ctx.followup.send(response)
 
         except Exception as e:
@@ -2,193 +2,371 @@
 Quests module for quest management functionality.
 """
 
+import time
 import sqlite3
 import logging
-from typing import List, Tuple, Optional
+from typing import Any, Dict, List, Tuple, Optional
 
 from utils.config import config
+from utils.quests_db import QuestsCache, QuestsDatabase
 
 logger = logging.getLogger(__name__)
 
 
-class QuestsModule:
-    """Handles quest management functionality."""
+# Quest lifecycle: requested -> assigned -> submitted -> approved or rejected
+REQUESTED = "requested"
+ASSIGNED = "assigned"
+SUBMITTED = "submitted"
+APPROVED = "approved"
+REJECTED = "rejected"
+
+# Reactions on completion notifications that approve or reject the quest
+APPROVE_EMOJI = "✅"
+REJECT_EMOJI = "❌"
+
+# Cache keys of the pending requesters and of a player's active quests
+PENDING_KEY = "pending"
+ACTIVE_KEY = "active"
+
 
-    CREATE_TABLE_QUESTS = """CREATE TABLE IF NOT EXISTS quests (
+def _migrate_player_ids_column(db: QuestsDatabase) -> None:
+    """Create the quests table, adding the user ID to older tables."""
+    # ``player`` keeps the username of the requester; quests are looked up by
+    # the Discord user ID in ``player_id``
+    db.execute("""CREATE TABLE IF NOT EXISTS quests (
         id integer PRIMARY KEY,
         player text NOT NULL,
         description text NULL,
-        reward text NULL
-    );"""
+        reward text NULL,
+        player_id integer NULL
+    )""")
+    columns = {row[1] for row in db.execute("PRAGMA table_info(quests)")}
+    if "player_id" not in columns:
+        db.execute("ALTER TABLE quests ADD COLUMN player_id integer")
+
+
+def _migrate_status(db: QuestsDatabase) -> None:
+    """Store the quest status and timestamps, and index the lookups."""
+    db.execute(
+        f"ALTER TABLE quests ADD COLUMN status text NOT NULL DEFAULT '{REQUESTED}'"
+    )
+    db.execute("ALTER TABLE quests ADD COLUMN created_at integer NULL")
+    db.execute("ALTER TABLE quests ADD COLUMN updated_at integer NULL")
+    # The creation time of older quests is unknown; the migration time is used
+    now = int(time.time())
+    db.execute(
+        """UPDATE quests SET
+            status = CASE
+                WHEN description IS NULL AND reward IS NULL THEN ?
+                ELSE ?
+            END,
+            created_at = ?,
+            updated_at = ?""",
+        (REQUESTED, ASSIGNED, now, now),
+    )
+    db.execute("DROP INDEX IF EXISTS quests_player_id")
+    db.execute("CREATE INDEX quests_player_status ON quests(player_id, status)")
+    db.execute("CREATE INDEX quests_status ON quests(status)")
+
+
+def _migrate_unique_request(db: QuestsDatabase) -> None:
+    """Allow a single pending request per player."""
+    # Older databases could hold duplicates; only the first one is kept.
+    # Quests not yet mapped to a user ID are grouped by username.
+    db.execute(
+        """UPDATE quests SET status = ?, updated_at = ?
+        WHERE status = ? AND id NOT IN (
+            SELECT min(id) FROM quests WHERE status = ?
+            GROUP BY coalesce(player_id, player)
+        )""",
+        (REJECTED, int(time.time()), REQUESTED, REQUESTED),
+    )
+    db.execute(f"""CREATE UNIQUE INDEX quests_one_request ON quests(player_id)
+        WHERE status = '{REQUESTED}'""")
+
+
+def _migrate_message_id(db: QuestsDatabase) -> None:
+    """Store the completion notification of submitted quests."""
+    db.execute("ALTER TABLE quests ADD COLUMN message_id integer NULL")
+    db.execute("""CREATE UNIQUE INDEX quests_message_id ON quests(message_id)
+        WHERE message_id IS NOT NULL""")
+
+
+# Schema migrations of quests.db, in order; never edit or remove one
+MIGRATIONS = (
+    _migrate_player_ids_column,
+    _migrate_status,
+    _migrate_unique_request,
+    _migrate_message_id,
+)
+
+
+class QuestsModule:
+    """Handles quest management functionality."""
 
     def __init__(self):
         """Initialize the quests module."""
-        self.db_path = config.QUEST_DB_PATH
-        self._create_table()
-
-    def _create_connection(self) -> Optional[sqlite3.Connection]:
-        """Create a new database connection."""
+        self.db = QuestsDatabase(config.QUEST_DB_PATH)
+        # Pending requesters and active quests per player, for autocomplete
+        self.cache = QuestsCache()
+        self._migrate()
+
+    def close(self) -> None:
+        """Finish queued queries and close the database."""
+        self.db.close()
+        logger.info(f"Quests database metrics: {self.metrics()}")
+
+    def metrics(self) -> Dict[str, Any]:
+        """Get the latency of the database operations and the cache counters."""
+        return {**self.db.executor.metrics(), "cache": self.cache.metrics()}
+
+    def _migrate(self) -> None:
+        """Bring the quests database schema up to date."""
         try:
-            conn = sqlite3.connect(self.db_path, timeout=10.0)
-            conn.execute("PRAGMA busy_timeout=10000")  # 10 second timeout
-            return conn
-        except Exception as e:
-            logger.error(f"Error creating connection: {e}")
-            return None
+            version = self.db.call(self.db.migrate, MIGRATIONS)
+            logger.info(f"Quests database at schema version {version}")
+        except sqlite3.Error as e:
+            logger.error(f"Error migrating quests database: {e}")
 
-    def _create_table(self) -> None:
-        """Create the quests table if it doesn't exist."""
-        conn = self._create_connection()
-        if not conn:
-            return
+    # Async API for the bot; every query runs on the database thread
+    async def migrate_player_ids(self, user_ids: Dict[str, int]) -> int:
+        """
+        Map the quests stored with a username only to the user's ID.
 
-        try:
-            cursor = conn.cursor()
-            cursor.execute(self.CREATE_TABLE_QUESTS)
-            conn.commit()
-            logger.info("Quests table created/verified")
-        except sqlite3.Error as e:
-            logger.error(f"Error creating table: {e}")
-        finally:
-            conn.close()
+        Args:
+            user_ids: Discord user IDs by username
 
-    def create_request(self, player: str) -> int:
+        Returns:
+            Number of quests migrated
+        """
+        migrated = await self.db.run(self._migrate_player_ids, user_ids)
+        if migrated:
+            self.cache.clear()
+        return migrated
+
+    async def create_request(self, player_id: int, player: str) -> int:
         """
         Create a new quest request for a player.
 
         Args:
-            player: Player identifier
+            player_id: Discord user ID of the player
+            player: Username of the player
 
         Returns:
             Quest ID if successful, -1 if player already has pending request
         """
-        conn = self._create_connection()
-        if not conn:
-            return -1
+        quest_id = await self.db.run(self._create_request, player_id, player)
+        if quest_id != -1:
+            self.cache.invalidate(PENDING_KEY)
+        return quest_id
 
+    async def get_users_with_pending_requests(self) -> List[Tuple[int, str]]:
+        """Get the user ID and username of users with pending quest requests."""
         try:
-            cursor = conn.cursor()
-
-            # Check for existing pending request
-            existing_sql = """SELECT * FROM quests WHERE player=? AND description IS NULL AND reward IS NULL"""
-            cursor.execute(existing_sql, (player,))
-            existing_record = cursor.fetchone()
-
-            if existing_record:
-                logger.info(f"Player {player} already has pending quest request")
-                return -1
-
-            # Insert new request
-            sql = """INSERT INTO quests(player, description, reward) VALUES(?,?,?)"""
-            cursor.execute(sql, (player, None, None))
-            conn.commit()
-
-            quest_id = cursor.lastrowid
-            logger.info(f"Created quest request {quest_id} for player {player}")
-            return quest_id
-
+            return list(
+                await self.cache.get(
+                    PENDING_KEY,
+                    lambda: self.db.run(self._get_users_with_pending_requests),
+                )
+            )
         except sqlite3.Error as e:
-            logger.error(f"Error creating quest request: {e}")
-            return -1
-        finally:
-            conn.close()
-
-    def get_users_with_pending_requests(self) -> List[str]:
-        """Get list of users with pending quest requests."""
-        conn = self._create_connection()
-        if not conn:
+            logger.error(f"Error getting pending requests: {e}")
             return []
 
+    async def get_user_active_quests(self, player_id: int) -> List[Tuple]:
+        """Get active quests for a player."""
         try:
-            sql = """SELECT player FROM quests WHERE description IS NULL AND reward IS NULL"""
-            cursor = conn.cursor()
-            cursor.execute(sql)
-            rows = cursor.fetchall()
-            return [row[0] for row in rows]
+            return list(
+                await self.cache.get(
+                    (ACTIVE_KEY, player_id),
+                    lambda: self.db.run(self._get_user_active_quests, player_id),
+                )
+            )
         except sqlite3.Error as e:
-            logger.error(f"Error getting pending requests: {e}")
+            logger.error(f"Error getting active quests: {e}")
             return []
-        finally:
-            conn.close()
 
-    def get_user_request_id(self, player: str) -> Optional[int]:
-        """Get the quest request ID for a player."""
-        conn = self._create_connection()
-        if not conn:
-            return None
+    async def assign_quest(
+        self, player_id: int, description: str, reward: str
+    ) -> Optional[int]:
+        """
+        Turn the pending request of a player into a quest.
 
-        try:
-            sql = """SELECT id FROM quests WHERE player=? AND description IS NULL AND reward IS NULL"""
-            cursor = conn.cursor()
-            cursor.execute(sql, (player,))
-            row = cursor.fetchone()
-            return row[0] if row else None
-        except sqlite3.Error as e:
-            logger.error(f"Error getting user request ID: {e}")
-            return None
-        finally:
-            conn.close()
+        Args:
+            player_id: Discord user ID of the player
+            description: Quest description
+            reward: Quest reward
 
-    def get_user_active_quests(self, player: str) -> List[Tuple]:
-        """Get active quests for a player."""
-        conn = self._create_connection()
-        if not conn:
-            return []
+        Returns:
+            The quest ID, or None if the player has no pending request
 
+        Raises:
+            sqlite3.Error: If the quest could not be updated
+        """
         try:
-            sql = """SELECT * FROM quests WHERE player=? AND description IS NOT NULL AND reward IS NOT NULL"""
-            cursor = conn.cursor()
-            cursor.execute(sql, (player,))
-            rows = cursor.fetchall()
-            return rows
-        except sqlite3.Error as e:
-            logger.error(f"Error getting active quests: {e}")
-            return []
+            return await self.db.run(self._assign_quest, player_id, description, reward)
         finally:
-            conn.close()
+            self.cache.invalidate(PENDING_KEY)
+            self.cache.invalidate((ACTIVE_KEY, player_id))
 
-    def update_request(self, player: str, description: str, reward: str) -> bool:
+    async def submit_quest(
+        self, quest_id: int, player_id: int, message_id: int
+    ) -> Optional[str]:
         """
-        Update a quest request with description and reward.
+        Mark an assigned quest of a player as completed, pending review.
 
         Args:
-            player: Player identifier
-            description: Quest description
-            reward: Quest reward
+            quest_id: Quest ID
+            player_id: Discord user ID of the player
+            message_id: Completion notification the quest is reviewed from
 
         Returns:
-            True if successful, False otherwise
+            The quest description, or None if the player has no such active quest
+
+        Raises:
+            sqlite3.Error: If the quest could not be updated
+        """
+        try:
+            return await self.db.run(
+                self._submit_quest, quest_id, player_id, message_id
+            )
+        finally:
+            self.cache.invalidate((ACTIVE_KEY, player_id))
+
+    async def review_submission(
+        self, message_id: int, approved: bool
+    ) -> Optional[Tuple[int, int, str]]:
+        """
+        Approve or reject the submitted quest of a notification message.
+
+        Returns:
+            The quest ID, player ID and description, or None if the message
+            belongs to no quest pending review
+
+        Raises:
+            sqlite3.Error: If the quest could not be updated
         """
-        conn = self._create_connection()
-        if not conn:
-            return False
+        return await self.db.run(self._review_submission, message_id, approved)
 
+    # Queries, run on the database thread
+    def _migrate_player_ids(self, user_ids: Dict[str, int]) -> int:
+        """Map the quests stored with a username only to the user's ID."""
         try:
-            request_id = self.get_user_request_id(player)
-            if not request_id:
-                return False
+            with self.db.transaction():
+                names = [
+                    row[0]
+                    for row in self.db.execute(
+                        "SELECT DISTINCT player FROM quests WHERE player_id IS NULL"
+                    )
+                ]
+                migrated = 0
+                for name in names:
+                    if name not in user_ids:
+                        logger.warning(f"No Discord user found for quest player {name}")
+                        continue
+                    # A request that would duplicate a pending one keeps no ID
+                    cursor = self.db.execute(
+                        "UPDATE OR IGNORE quests SET player_id = ? WHERE player_id IS NULL AND player = ?",
+                        (user_ids[name], name),
+                    )
+                    migrated += cursor.rowcount
 
-            sql = """UPDATE quests SET description = ?, reward = ? WHERE id = ?"""
-            cursor = conn.cursor()
-            cursor.execute(sql, (description, reward, request_id))
-            conn.commit()
+            if migrated:
+                logger.info(f"Migrated {migrated} quests to Discord user IDs")
+            return migrated
+
+        except sqlite3.Error as e:
+            logger.error(f"Error migrating quest player IDs: {e}")
+            return 0
+
+    # Every lifecycle transition is a single conditional statement, so
+    # concurrent commands cannot both apply it
+    def _create_request(self, player_id: int, player: str) -> int:
+        """Create a new quest request for a player."""
+        try:
+            now = int(time.time())
+            # The unique index on pending requests rejects a second one
+            rows = self.db.execute(
+                """INSERT INTO quests(player, player_id, status, created_at, updated_at)
+                VALUES(?,?,?,?,?) ON CONFLICT DO NOTHING RETURNING id""",
+                (player, player_id, REQUESTED, now, now),
+            ).fetchall()
+            if not rows:
+                logger.info(f"Player {player} already has pending quest request")
+                return -1
 
-            logger.info(f"Updated quest {request_id} for player {player}")
-            return True
+            quest_id = rows[0][0]
+            logger.info(f"Created quest request {quest_id} for player {player}")
+            return quest_id
 
         except sqlite3.Error as e:
-            logger.error(f"Error updating quest request: {e}")
-            return False
-        finally:
-            conn.close()
+            logger.error(f"Error creating quest request: {e}")
+            return -1
+
+    def _get_users_with_pending_requests(self) -> Tuple[Tuple[int, str], ...]:
+        """Get the user ID and username of users with pending quest requests."""
+        sql = """SELECT player_id, player FROM quests WHERE status=? AND player_id IS NOT NULL"""
+        return tuple((row[0], row[1]) for row in self.db.execute(sql, (REQUESTED,)))
+
+    def _get_user_active_quests(self, player_id: int) -> Tuple[Tuple, ...]:
+        """Get active quests for a player."""
+        sql = """SELECT id, player, description, reward FROM quests WHERE player_id=? AND status=?"""
+        return tuple(self.db.execute(sql, (player_id, ASSIGNED)))
+
+    def _assign_quest(
+        self, player_id: int, description: str, reward: str
+    ) -> Optional[int]:
+        """Turn the pending request of a player into a quest."""
+        rows = self.db.execute(
+            """UPDATE quests SET description = ?, reward = ?, status = ?, updated_at = ?
+            WHERE player_id = ? AND status = ? RETURNING id""",
+            (description, reward, ASSIGNED, int(time.time()), player_id, REQUESTED),
+        ).fetchall()
+        if not rows:
+            return None
+
+        logger.info(f"Assigned quest {rows[0][0]} to player {player_id}")
+        return rows[0][0]
+
+    def _submit_quest(
+        self, quest_id: int, player_id: int, message_id: int
+    ) -> Optional[str]:
+        """Mark an assigned quest of a player as completed, pending review."""
+        rows = self.db.execute(
+            """UPDATE quests SET status = ?, message_id = ?, updated_at = ?
+            WHERE id = ? AND player_id = ? AND status = ? RETURNING description""",
+            (SUBMITTED, message_id, int(time.time()), quest_id, player_id, ASSIGNED),
+        ).fetchall()
+        if not rows:
+            return None
+
+        logger.info(f"Quest {quest_id} submitted by player {player_id}")
+        return rows[0][0]
+
+    def _review_submission(
+        self, message_id: int, approved: bool
+    ) -> Optional[Tuple[int, int, str]]:
+        """Approve or reject the submitted quest of a notification message."""
+        status = APPROVED if approved else REJECTED
+        rows = self.db.execute(
+            """UPDATE quests SET status = ?, updated_at = ?
+            WHERE message_id = ? AND status = ?
+            RETURNING id, player_id, description""",
+            (status, int(time.time()), message_id, SUBMITTED),
+        ).fetchall()
+        if not rows:
+            return None
+
+        logger.info(f"Quest {rows[0][0]} {status}")
+        return rows[0]
 
     async def handle_request_command(self, ctx):
         """Handle the quest request command."""
         try:
             await ctx.defer()
 
-            player = ctx.user.name
-            request_id = self.create_request(player)
+            player = ctx.user
+            request_id = await self.create_request(player.id, player.name)
 
             if request_id == -1:
                 await ctx.followup.send(
@@ -205,7 +383,7 @@ class QuestsModule:
                     if channel:
                         embed = discord.Embed(
                             title="Nueva solicitud de misión",
-                            description=f"**Solicitante:** {player}",
+                            description=f"**Solicitante:** {player.mention}",
                         )
                         await channel.send(embed=embed)
 
@@ -213,7 +391,7 @@ class QuestsModule:
                         "Solicitud de misión enviada.", ephemeral=True
                     )
                     logger.info(
-                        f"Quest request created for {player} with ID {request_id}"
+                        f"Quest request created for {player.id} with ID {request_id}"
                     )
                 except Exception as e:
                     logger.error(f"Error sending quest request notification: {e}")
@@ -233,56 +411,72 @@ class QuestsModule:
         try:
             await ctx.defer()
 
-            request_id = self.get_user_request_id(jugador)
+            # The autocomplete offers the requesters' names with their IDs as values
+            player_id = int(jugador) if jugador.isdigit() else None
+            request_id = (
+                await self.assign_quest(player_id, descripción, recompensa)
+                if player_id
+                else None
+            )
             if not request_id:
                 await ctx.followup.send(
                     "El jugador no tiene una solicitud pendiente.", ephemeral=True
                 )
                 return
 
-            success = self.update_request(jugador, descripción, recompensa)
-            if success:
-                # Send a message to the user's quest channel
-                import discord
+            # Send a message to the user's quest channel
+            import discord
 
-                try:
-                    # Check if user has a configured quest channel
-                    quest_channels = getattr(config, "QUEST_CHANNEL_ID_DICT", {})
-                    if jugador in quest_channels:
-                        channel = ctx.bot.get_channel(quest_channels[jugador])
-                        if channel:
-                            embed = discord.Embed(
-                                title=descripción,
-                                fields=[
-                                    discord.EmbedField(
-                                        name="Recompensa", value=recompensa
-                                    ),
-                                ],
-                            )
-                            embed.set_author(name=f"Misión n.º {request_id}")
-                            await channel.send(embed=embed)
-
-                    await ctx.followup.send("Misión creada.")
-                    logger.info(f"Quest created for {jugador}: {descripción}")
-                except Exception as e:
-                    logger.error(f"Error sending quest to player channel: {e}")
-                    await ctx.followup.send(
-                        "Misión creada, pero no se pudo enviar al jugador.",
-                        ephemeral=True,
-                    )
-            else:
-                await ctx.followup.send("Error al crear la misión.", ephemeral=True)
+            try:
+                # Check if user has a configured quest channel
+                channel_id = self._quest_channel_id(ctx.bot, player_id)
+                if channel_id:
+                    channel = ctx.bot.get_channel(channel_id)
+                    if channel:
+                        embed = discord.Embed(
+                            title=descripción,
+                            fields=[
+                                discord.EmbedField(name="Recompensa", value=recompensa),
+                            ],
+                        )
+                        embed.set_author(name=f"Misión n.º {request_id}")
+                        await channel.send(embed=embed)
+
+                await ctx.followup.send("Misión creada.")
+                logger.info(f"Quest created for {player_id}: {descripción}")
+            except Exception as e:
+                logger.error(f"Error sending quest to player channel: {e}")
+                await ctx.followup.send(
+                    "Misión creada, pero no se pudo enviar al jugador.",
+                    ephemeral=True,
+                )
 
         except Exception as e:
             logger.error(f"Error in handle_create_command: {e}")
             await ctx.followup.send("Error al crear la misión.", ephemeral=True)
 
     async def handle_complete_command(self, ctx, misión: str):
-        """Handle the quest completion command."""
+        """Handle the quest completion command.
+
+        The notification is sent before the quest is submitted, so a quest is
+        never left pending review without a message to review it from.
+        """
         try:
             await ctx.defer()
 
-            player = ctx.user.name
+            player = ctx.user
+
+            # The autocomplete offers the active quests as "<id>: <description>"
+            quest_id = misión.split(":", 1)[0].strip()
+            active = {
+                record[0]: record[2]
+                for record in await self.get_user_active_quests(player.id)
+            }
+            if not quest_id.isdigit() or int(quest_id) not in active:
+                await ctx.followup.send("No tienes esa misión activa.", ephemeral=True)
+                return
+            quest_id = int(quest_id)
+            description = active[quest_id]
 
             # Get the last message in the channel
             last_message = await ctx.channel.history(limit=1).flatten()
@@ -298,36 +492,94 @@ class QuestsModule:
             # Send completion notification
             import discord
 
-            try:
-                completed_channel_id = config.COMPLETED_QUESTS_CHANNEL_ID
-                channel = ctx.bot.get_channel(completed_channel_id)
-
-                if channel:
-                    embed = discord.Embed(
-                        title="Misión completada",
-                        description=f"{player} ha completado la misión «{misión}».\n\n[Enlace al último mensaje]({last_message_link})",
-                    )
-                    message = await channel.send(embed=embed)
-                    await message.add_reaction("✅")  # Checkmark reaction
-                    await message.add_reaction("❌")  # Cross reaction
-
-                await ctx.followup.send("Misión completada.", ephemeral=True)
-                logger.info(f"Quest completed by {player}: {misión}")
-            except Exception as e:
-                logger.error(f"Error sending completion notification: {e}")
+            channel = ctx.bot.get_channel(config.COMPLETED_QUESTS_CHANNEL_ID)
+            if channel is None:
+                logger.error("Completed quests channel not found")
                 await ctx.followup.send(
-                    "Misión marcada como completada, pero no se pudo enviar la notificación.",
+                    "No se pudo enviar la notificación; la misión sigue activa.",
                     ephemeral=True,
                 )
+                return
+
+            embed = discord.Embed(
+                title="Misión completada",
+                description=f"{player.mention} ha completado la misión «{description}».\n\n[Enlace al último mensaje]({last_message_link})",
+            )
+            message = await channel.send(embed=embed)
+            if await self.submit_quest(quest_id, player.id, message.id) is None:
+                # Submitted by a concurrent command since it was looked up
+                await message.delete()
+                await ctx.followup.send("No tienes esa misión activa.", ephemeral=True)
+                return
+
+            await ctx.followup.send("Misión completada.", ephemeral=True)
+            logger.info(f"Quest completed by {player.id}: {misión}")
+            try:
+                await message.add_reaction(APPROVE_EMOJI)
+                await message.add_reaction(REJECT_EMOJI)
+            except Exception as e:
+                # Reviewers can still add the reactions themselves
+                logger.error(f"Error adding review reactions: {e}")
 
         except Exception as e:
             logger.error(f"Error in handle_complete_command: {e}")
             await ctx.followup.send("Error al completar la misión.", ephemeral=True)
 
-    def get_quest_options_for_player(self, player: str) -> List[str]:
+    async def handle_review_reaction(self, bot, payload) -> None:
+        """
+        Approve or reject a quest from a reaction to its completion notification.
+
+        Works from the raw reaction event, so the notification does not need
+        to be in the message cache: the quest is found by the message ID.
+
+        Args:
+            bot: Discord bot
+            payload: ``on_raw_reaction_add`` payload
+        """
+        emoji = str(payload.emoji)
+        if (
+            payload.channel_id != config.COMPLETED_QUESTS_CHANNEL_ID
+            or emoji not in (APPROVE_EMOJI, REJECT_EMOJI)
+            or payload.user_id == bot.user.id
+        ):
+            return
+        # Only administrators review quests
+        member = payload.member
+        if member is None or not member.guild_permissions.administrator:
+            return
+
+        try:
+            reviewed = await self.review_submission(
+                payload.message_id, emoji == APPROVE_EMOJI
+            )
+            if reviewed is None:
+                return
+
+            quest_id, player_id, description = reviewed
+            channel_id = self._quest_channel_id(bot, player_id)
+            channel = bot.get_channel(channel_id) if channel_id else None
+            if channel:
+                verdict = "aprobada" if emoji == APPROVE_EMOJI else "rechazada"
+                await channel.send(
+                    f"<@{player_id}>, tu misión n.º {quest_id} «{description}» "
+                    f"ha sido {verdict}."
+                )
+        except Exception as e:
+            logger.error(f"Error reviewing quest from reaction: {e}")
+
+    @staticmethod
+    def _quest_channel_id(bot, player_id: int) -> Optional[int]:
+        """Get the quest channel of a user, configured by ID or username."""
+        quest_channels = getattr(config, "QUEST_CHANNEL_ID_DICT", {})
+        if player_id in quest_channels:
+            return quest_channels[player_id]
+        user = bot.get_user(player_id)
+        return quest_channels.get(user.name) if user else None
+
+    async def get_quest_options_for_player(self, player_id: int) -> List[str]:
         """Get quest options for autocomplete."""
         try:
-            records = self.get_user_active_quests(player)
+            records = await self.get_user_active_quests(player_id)
             return [f"{record[0]}: {record[2]}" for record in records if record[2]]
         except Exception as e:
             logger.error(f"Error getting quest options: {e}")
@@ -0,0 +1,17 @@
+"""
+Riddle of the sphinx. Example of a puzzle with an answer and a reward.
+"""
+
+from utils.puzzles import Puzzle
+
+PUZZLE = Puzzle(
+    name="esfinge",
+    prompt=(
+        "¿Qué criatura camina a cuatro patas por la mañana, "
+        "a dos al mediodía y a tres por la noche?"
+    ),
+    # Accepts "el hombre", "hombre", "el ser humano", "humano"...
+    pattern=r"(el )?(hombre|ser humano|humano)",
+    success="La esfinge se aparta y deja ver un pasadizo.",
+    reward=("Amuleto de la esfinge", "Un amuleto que la esfinge te ha entregado."),
+)
@@ -0,0 +1,7 @@
+"""
+Sample puzzle that only greets the players.
+"""
+
+from utils.puzzles import Puzzle
+
+PUZZLE = Puzzle(name="hola", prompt="¡Hola!")
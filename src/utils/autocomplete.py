@@ -0,0 +1,77 @@
+"""
+Autocomplete helpers.
+Caches option lists and answers prefix queries without rescanning them.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Iterable, List
+
+# Discord shows at most this many autocomplete choices
+MAX_CHOICES = 25
+
+
+class PrefixIndex:
+    """Options indexed by every prefix of their lowercase form.
+
+    A search returns the same options as ``discord.utils.basic_autocomplete``
+    (case-insensitive prefix match, original order, at most 25) with a single
+    dictionary lookup.
+    """
+
+    def __init__(self, options: Iterable[str]):
+        """Index the given options."""
+        self.options: List[str] = list(options)
+        self._prefixes: Dict[str, List[str]] = {}
+        for option in self.options:
+            text = str(option).lower()
+            for end in range(len(text) + 1):
+                matches = self._prefixes.setdefault(text[:end], [])
+                if len(matches) < MAX_CHOICES:
+                    matches.append(option)
+
+    def search(self, prefix: str = "") -> List[str]:
+        """Get the options starting with the given text."""
+        return list(self._prefixes.get(str(prefix or "").lower(), []))
+
+
+class OptionsCache:
+    """Least recently used cache of prefix-indexed option lists.
+
+    Keys should include a version of the data the options are built from,
+    so that entries of older versions are never read again and age out.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        """Create an empty cache holding up to ``max_entries`` option lists."""
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, PrefixIndex]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, build: Callable[[], Iterable[str]]) -> PrefixIndex:
+        """Get the options cached under a key, building them on a miss."""
+        with self._lock:
+            index = self._entries.get(key)
+            if index is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return index
+            self.misses += 1
+
+        index = PrefixIndex(build())
+        with self._lock:
+            self._entries[key] = index
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return index
+
+    def metrics(self) -> Dict[str, int]:
+        """Get the hit and miss counters and the number of cached lists."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+            }
@@ -25,6 +25,7 @@ class Config:
 
     # Quest Configuration
     QUEST_REQUESTS_CHANNEL_ID = 1275940735266328648
+    # Quest channel of each player, by Discord user ID (or username)
     QUEST_CHANNEL_ID_DICT = {"jorgeygari": 1059245948590633123}
     COMPLETED_QUESTS_CHANNEL_ID = 1276207418128207922
 
@@ -34,9 +35,38 @@ class Config:
     # File Paths
     DATA_DIR = "data"
     DOWNLOADS_DIR = "downloads"
-    DISCAPE_FILE = "data/file.xlsx"
+    DISCAPE_GAMES_DIR = "data/discape"
+    # Workbook of the single game played before games were kept per guild;
+    # the first guild that plays after the upgrade takes it over
+    DISCAPE_LEGACY_FILE = "data/file.xlsx"
     PRIZES_FILE = "data/prizes.csv"
 
+    # Discape Configuration
+    # Seconds between two exports of changed games to their workbook; 0 only
+    # exports them with /escape exportar
+    DISCAPE_EXPORT_INTERVAL = float(os.getenv("DISCAPE_EXPORT_INTERVAL", "0"))
+    # Storage engine for the live game: "sqlite" or "journal"
+    DISCAPE_STORAGE = os.getenv("DISCAPE_STORAGE", "sqlite")
+    # Seconds between two fsyncs of the journal, and actions between snapshots
+    DISCAPE_JOURNAL_FSYNC_INTERVAL = float(
+        os.getenv("DISCAPE_JOURNAL_FSYNC_INTERVAL", "0.2")
+    )
+    DISCAPE_SNAPSHOT_EVERY = int(os.getenv("DISCAPE_SNAPSHOT_EVERY", "500"))
+    # Worker threads for Discape actions; actions in one room never overlap
+    DISCAPE_WORKERS = int(os.getenv("DISCAPE_WORKERS", "4"))
+    # One game per "guild" or per "category"; each is kept in its own directory
+    DISCAPE_GAME_SCOPE = os.getenv("DISCAPE_GAME_SCOPE", "guild")
+    # Approximate memory for loaded games before idle ones are evicted
+    DISCAPE_MEMORY_BUDGET_MB = float(os.getenv("DISCAPE_MEMORY_BUDGET_MB", "256"))
+    # Directory with the puzzle plugins of "Puzle" attractions
+    DISCAPE_PUZZLES_DIR = os.getenv(
+        "DISCAPE_PUZZLES_DIR", os.path.join(os.path.dirname(__file__), "..", "puzzles")
+    )
+    # Largest workbook accepted by /escape iniciar
+    DISCAPE_MAX_UPLOAD_BYTES = (
+        int(os.getenv("DISCAPE_MAX_UPLOAD_MB", "10")) * 1024 * 1024
+    )
+
     # Music Configuration
     YTDL_OPTS = {
         "format": "bestaudio/best",
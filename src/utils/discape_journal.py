@@ -0,0 +1,313 @@
+"""
+Journal storage engine for the Discape module.
+Persists the game state as compacted snapshots plus an append-only action journal.
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from utils.discape_model import Attraction, Character, GameState, Item
+
+logger = logging.getLogger(__name__)
+
+
+class DiscapeJournal:
+    """Discape game state stored as a snapshot and the actions taken since.
+
+    Every action appends one JSON line with the mutations it made, so the
+    cost of persisting an action does not depend on the size of the game.
+    Lines are written immediately and fsynced in batches every
+    ``fsync_interval`` seconds. Every ``snapshot_every`` actions the state is
+    compacted into a new snapshot and the journal is archived, which keeps
+    an audit trail of the whole game. Loading replays the journal tail on top
+    of the latest snapshot.
+    """
+
+    SNAPSHOT_FILE = "snapshot.json"
+    JOURNAL_FILE = "journal.jsonl"
+
+    def __init__(
+        self, directory: str, fsync_interval: float = 0.2, snapshot_every: int = 500
+    ):
+        """Open the journal in the given directory."""
+        self.directory = directory
+        self.fsync_interval = fsync_interval
+        self.snapshot_every = snapshot_every
+        self.snapshot_path = os.path.join(directory, self.SNAPSHOT_FILE)
+        self.journal_path = os.path.join(directory, self.JOURNAL_FILE)
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.RLock()
+        # Called under the lock after a failed action is discarded
+        self.on_rollback: Optional[Callable[[], None]] = None
+        self._state: Optional[GameState] = None
+        self._seq = 0
+        self._next_item_id = 1
+        self._since_snapshot = 0
+        self._depth = 0
+        self._action: Optional[str] = None
+        self._details: Dict[str, Any] = {}
+        self._ops: List[Dict[str, Any]] = []
+        self._unsynced = False
+        self._file = open(self.journal_path, "a", encoding="utf-8")
+
+        self._closed = threading.Event()
+        self._thread = threading.Thread(
+            target=self._sync_loop, name=f"journal:{directory}", daemon=True
+        )
+        self._thread.start()
+
+    def close(self) -> None:
+        """Write a final snapshot and close the journal."""
+        self._closed.set()
+        self._thread.join()
+        with self._lock:
+            if self._state and self._since_snapshot:
+                self.snapshot()
+            self._sync()
+            self._file.close()
+
+    @contextmanager
+    def transaction(self, action: Optional[str] = None, **details) -> Iterator[None]:
+        """Group the mutations of an action into a single journal entry.
+
+        If the action fails, none of its mutations are written, as a
+        rollback of the SQLite store would do.
+        """
+        with self._lock:
+            if self._depth == 0:
+                self._action, self._details = action, details
+            self._depth += 1
+            try:
+                yield
+            except Exception:
+                if self._depth == 1:
+                    self._ops, self._action, self._details = [], None, {}
+                    if self.on_rollback:
+                        self.on_rollback()
+                raise
+            finally:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._commit()
+
+    def import_state(self, state: GameState) -> None:
+        """Replace the stored game with the given game state."""
+        with self._lock:
+            attraction_id = 1
+            for graph in state.rooms.values():
+                for attraction in graph.attractions:
+                    attraction.id = attraction_id
+                    attraction_id += 1
+            self._next_item_id = 1
+            for items in state.inventories.values():
+                for item in items:
+                    item.id = self._next_id()
+
+            self._state = state
+            self.snapshot()
+
+        logger.info(f"Imported Discape game into {self.directory}")
+
+    def load(self) -> Optional[GameState]:
+        """Load the latest snapshot and replay the journal written after it."""
+        with self._lock:
+            if not os.path.exists(self.snapshot_path):
+                return None
+
+            with open(self.snapshot_path, encoding="utf-8") as f:
+                snapshot = json.load(f)
+            state = GameState.from_dict(snapshot["state"])
+            self._seq = snapshot["seq"]
+            self._next_item_id = snapshot["next_item_id"]
+
+            replayed = self._replay(state)
+            self._state = state
+            self._since_snapshot = replayed
+            logger.info(
+                f"Loaded Discape snapshot {snapshot['seq']} and replayed "
+                f"{replayed} journal entries"
+            )
+            return state
+
+    def update_character(self, character: Character) -> None:
+        """Record the location, equipped item and user ID of a character."""
+        self._record(
+            {
+                "op": "character",
+                "player": character.player,
+                "room": character.room,
+                "path": character.path,
+                "hand": character.hand,
+                "player_id": character.player_id,
+            }
+        )
+
+    def add_item(self, item: Item) -> None:
+        """Record a new inventory item and assign its ID."""
+        with self._lock:
+            item.id = self._next_id()
+            self._record(
+                {
+                    "op": "add_item",
+                    "id": item.id,
+                    "room": item.room,
+                    "name": item.name,
+                    "description": item.description,
+                }
+            )
+
+    def remove_item(self, item: Item) -> None:
+        """Record the removal of an inventory item."""
+        self._record({"op": "remove_item", "id": item.id, "room": item.room})
+
+    def update_attraction(self, attraction: Attraction) -> None:
+        """Record the key of an attraction."""
+        self._record({"op": "attraction", "id": attraction.id, "key": attraction.key})
+
+    def remove_attraction(self, attraction: Attraction) -> None:
+        """Record the removal of an attraction."""
+        self._record({"op": "remove_attraction", "id": attraction.id})
+
+    def snapshot(self) -> None:
+        """Compact the current state into a snapshot and archive the journal."""
+        with self._lock:
+            data = {
+                "seq": self._seq,
+                "next_item_id": self._next_item_id,
+                "state": self._state.to_dict(),
+            }
+            tmp_path = f"{self.snapshot_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.snapshot_path)
+
+            # Start a new journal; the old one is kept as the audit trail
+            self._file.close()
+            if os.path.getsize(self.journal_path):
+                os.replace(
+                    self.journal_path,
+                    os.path.join(self.directory, f"journal-{self._seq:08d}.jsonl"),
+                )
+            self._file = open(self.journal_path, "a", encoding="utf-8")
+            self._unsynced = False
+            self._since_snapshot = 0
+
+    def _next_id(self) -> int:
+        """Allocate an inventory item ID."""
+        item_id = self._next_item_id
+        self._next_item_id += 1
+        return item_id
+
+    def _record(self, op: Dict[str, Any]) -> None:
+        """Add a mutation to the current action."""
+        with self._lock:
+            self._ops.append(op)
+            if self._depth == 0:
+                self._commit()
+
+    def _commit(self) -> None:
+        """Append the current action to the journal."""
+        ops, self._ops = self._ops, []
+        action, self._action = self._action, None
+        details, self._details = self._details, {}
+        if not ops:
+            return
+
+        self._seq += 1
+        entry = {"seq": self._seq, "time": time.time(), "action": action}
+        entry.update(details)
+        entry["ops"] = ops
+        self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._file.flush()
+        self._unsynced = True
+
+        self._since_snapshot += 1
+        if self._since_snapshot >= self.snapshot_every:
+            self.snapshot()
+
+    def _sync(self) -> None:
+        """Fsync the journal if entries were written since the last sync."""
+        with self._lock:
+            if not self._unsynced:
+                return
+            self._unsynced = False
+            # A snapshot may close the file meanwhile; the duplicate keeps it
+            # open, so the fsync still reaches the journal it was written to
+            fd = os.dup(self._file.fileno())
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def _sync_loop(self) -> None:
+        """Fsync written entries in batches until the journal is closed."""
+        while not self._closed.wait(self.fsync_interval):
+            try:
+                self._sync()
+            except Exception as e:
+                logger.error(f"Error syncing Discape journal: {e}")
+
+    def _replay(self, state: GameState) -> int:
+        """Apply the journal entries newer than the snapshot to the state."""
+        if not os.path.exists(self.journal_path):
+            return 0
+
+        attractions = {
+            attraction.id: graph
+            for graph in state.rooms.values()
+            for attraction in graph.attractions
+        }
+        replayed = 0
+        with open(self.journal_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning("Ignoring truncated Discape journal entry")
+                    break
+                if entry["seq"] <= self._seq:
+                    continue
+                for op in entry["ops"]:
+                    _apply(state, attractions, op)
+                    # Items added after the snapshot keep their IDs taken
+                    if op["op"] == "add_item":
+                        self._next_item_id = max(self._next_item_id, op["id"] + 1)
+                self._seq = entry["seq"]
+                replayed += 1
+        return replayed
+
+
+def _apply(state: GameState, attractions: Dict[int, Any], op: Dict[str, Any]) -> None:
+    """Apply a journaled mutation to the game state."""
+    kind = op["op"]
+    if kind == "character":
+        character = state.characters[op["player"]]
+        character.room = op["room"]
+        character.path = op["path"]
+        character.hand = op["hand"]
+        if op.get("player_id") is not None:
+            state.bind_player(character, op["player_id"])
+    elif kind == "add_item":
+        state.add_item(Item(op["name"], op["description"], op["room"], op["id"]))
+    elif kind == "remove_item":
+        item = next(i for i in state.inventory(op["room"]) if i.id == op["id"])
+        state.remove_item(item)
+    elif kind == "attraction":
+        graph = attractions[op["id"]]
+        attraction = next(a for a in graph.attractions if a.id == op["id"])
+        if op["key"] is None:
+            graph.unlock(attraction)
+        else:
+            attraction.key = op["key"]
+    elif kind == "remove_attraction":
+        graph = attractions[op["id"]]
+        attraction = next(a for a in graph.attractions if a.id == op["id"])
+        graph.remove(attraction)
@@ -0,0 +1,549 @@
+"""
+In-memory game state for the Discape module.
+Indexes the escape room workbook once so that lookups don't scan sheets.
+"""
+
+import sys
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+from openpyxl import Workbook
+
+# Sheet layout of the escape room workbook
+CHARACTERS_SHEET = "Personajes"
+INVENTORY_SHEET = "Inventario"
+COMBINATIONS_SHEET = "Combinaciones"
+FIRST_ROOM_SHEET = 3
+
+# Column indices for character sheet
+CHAR_NAME_COL = 0
+CHAR_USER_COL = 1
+CHAR_ROOM_COL = 2
+CHAR_PATH_COL = 3
+CHAR_HAND_COL = 4
+CHAR_STATS_COL = 5
+
+# Special values of the "Camino" column of an escape room sheet
+OBJECT = "Objeto"
+FINAL = "Final"
+PUZZLE = "Puzle"
+PASSAGE = "Camino"
+
+# Sheet headers used when exporting the game state
+CHARACTERS_HEADER = ["Nombre", "Jugador", "Sala", "Camino", "Equipado"]
+INVENTORY_HEADER = ["Objeto", "Descripción", "Sala"]
+COMBINATIONS_HEADER = ["Objeto 1", "Objeto 2", "Resultado", "Descripción", "Sala"]
+ROOM_HEADER = ["Atracción", "Descripción", "Profundidad", "Camino", "Llave", "Acción"]
+
+
+@dataclass
+class Character:
+    """A character from the Personajes sheet.
+
+    ``player`` is the Jugador cell: a Discord username or user ID. The
+    character is played by the user with ID ``player_id``, which is bound
+    the first time a user with that name plays if the cell holds a name.
+    ``stats`` holds the stat values in the order of ``GameState.stat_names``.
+    """
+
+    row: int
+    name: str
+    player: str
+    room: Optional[str] = None
+    path: Optional[str] = None
+    hand: Optional[str] = None
+    stats: List[int] = field(default_factory=list)
+    player_id: Optional[int] = None
+
+
+@dataclass
+class Item:
+    """An item in a room's shared inventory."""
+
+    name: str
+    description: str
+    room: str
+    id: Optional[int] = None
+    removed: bool = field(default=False, repr=False)
+
+
+@dataclass
+class Combination:
+    """A recipe from the Combinaciones sheet."""
+
+    item1: str
+    item2: str
+    result: str
+    description: str
+    room: str
+
+
+@dataclass
+class Attraction:
+    """A row of an escape room sheet."""
+
+    name: str
+    description: Optional[str] = None
+    depth: Optional[str] = None
+    path: Optional[str] = None
+    key: Optional[str] = None
+    action: Optional[str] = None
+    id: Optional[int] = None
+    kind: str = field(init=False, repr=False)
+    target: Optional[str] = field(init=False, repr=False)
+    puzzle: Optional[str] = field(init=False, repr=False)
+    removed: bool = field(default=False, init=False, repr=False)
+
+    def __post_init__(self):
+        """Precompute the node type and the path reached by investigating it."""
+        self.puzzle = None
+        if self.path in (OBJECT, FINAL):
+            self.kind = self.path
+        elif self.path and self.path.startswith(PUZZLE):
+            self.kind = PUZZLE
+            words = self.path.split(" ")
+            self.puzzle = words[1] if len(words) > 1 else None
+        else:
+            self.kind = PASSAGE
+        self.target = ((self.depth or "") + (self.path or "")) or None
+
+    @property
+    def parent(self) -> Optional[str]:
+        """Get the depth from which this attraction can be unlocked."""
+        return (self.depth[:-1] or None) if self.depth else None
+
+    def values(self) -> List[Optional[str]]:
+        """Get the attraction as a sheet row."""
+        return [
+            self.name,
+            self.description,
+            self.depth,
+            self.path,
+            self.key,
+            self.action,
+        ]
+
+
+class RoomGraph:
+    """Attractions of a single escape room compiled into a tree of depths.
+
+    Every depth (path string) maps to the attractions found there, so
+    navigation, visibility and unlock checks are dictionary lookups. The
+    indexes are updated in place when a zone is unlocked or an item is
+    picked up. Picked up attractions are only flagged as removed and are
+    dropped from the lists by ``compact``, which ``remove`` runs once they
+    outnumber the attractions left.
+    """
+
+    def __init__(self, attractions: Iterable[Attraction]):
+        """Compile the indexes for the given attractions."""
+        self.attractions: List[Attraction] = list(attractions)
+        self.children: Dict[Optional[str], List[Attraction]] = {}
+        self.by_name: Dict[str, List[Attraction]] = {}
+        self.locked: Dict[Tuple[Optional[str], str], List[Attraction]] = {}
+        self.visible: Dict[Optional[str], List[str]] = {}
+        self.tombstones = 0
+        for attraction in self.attractions:
+            self.children.setdefault(attraction.depth, []).append(attraction)
+            self.by_name.setdefault(attraction.name, []).append(attraction)
+            if attraction.key is not None:
+                self.locked.setdefault((attraction.parent, attraction.key), []).append(
+                    attraction
+                )
+        for depth in self.children:
+            self._update_visible(depth)
+
+    def _update_visible(self, depth: Optional[str]) -> None:
+        """Recompute the visible attraction names at a depth."""
+        self.visible[depth] = [
+            attraction.name
+            for attraction in self.children.get(depth, [])
+            if attraction.key is None and not attraction.removed
+        ]
+
+    def visible_at(self, depth: Optional[str]) -> List[str]:
+        """Get the names of the unlocked attractions at a depth."""
+        return list(self.visible.get(depth, []))
+
+    def find(self, depth: Optional[str], name: str) -> Optional[Attraction]:
+        """Find the attraction with the given name at the given depth."""
+        for attraction in self.children.get(depth, []):
+            if attraction.name == name and not attraction.removed:
+                return attraction
+        return None
+
+    def first_named(self, name: str) -> Optional[Attraction]:
+        """Get the first attraction of the room with the given name."""
+        attractions = self.by_name.get(name)
+        return attractions[0] if attractions else None
+
+    def path_of(self, name: str) -> str:
+        """Get the path step of the first attraction with the given name."""
+        attraction = self.first_named(name)
+        return (attraction.path or "") if attraction else ""
+
+    def key_at(self, depth: Optional[str]) -> str:
+        """Get the key of the first attraction at a depth."""
+        for attraction in self.children.get(depth, []):
+            if not attraction.removed:
+                return attraction.key or ""
+        return ""
+
+    def locked_by(self, depth: Optional[str], key: str) -> Optional[Attraction]:
+        """Get an attraction below a depth that the given key unlocks."""
+        attractions = self.locked.get((depth, key))
+        return attractions[0] if attractions else None
+
+    def unlock(self, attraction: Attraction) -> None:
+        """Remove the key of an attraction, making it visible."""
+        self._discard_lock(attraction)
+        attraction.key = None
+        self._update_visible(attraction.depth)
+
+    def remove(self, attraction: Attraction) -> None:
+        """Remove an attraction from the room, leaving a tombstone."""
+        attraction.removed = True
+        self.tombstones += 1
+        self.by_name[attraction.name].remove(attraction)
+        if not self.by_name[attraction.name]:
+            del self.by_name[attraction.name]
+        self._discard_lock(attraction)
+        self._update_visible(attraction.depth)
+        if self.tombstones * 2 > len(self.attractions):
+            self.compact()
+
+    def compact(self) -> None:
+        """Drop the removed attractions from the lists."""
+        if not self.tombstones:
+            return
+        self.attractions = [a for a in self.attractions if not a.removed]
+        self.children = {
+            depth: [a for a in attractions if not a.removed]
+            for depth, attractions in self.children.items()
+        }
+        self.tombstones = 0
+
+    def _discard_lock(self, attraction: Attraction) -> None:
+        """Drop an attraction from the locked index."""
+        if attraction.key is None:
+            return
+        index = (attraction.parent, attraction.key)
+        self.locked[index].remove(attraction)
+        if not self.locked[index]:
+            del self.locked[index]
+
+
+def parse_player_id(value: Any) -> Optional[int]:
+    """Get the Discord user ID in a Jugador cell, or None if it holds a name."""
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str) and value.strip().isdigit():
+        return int(value)
+    return None
+
+
+def _pair(room: str, item1: str, item2: str) -> Tuple[str, FrozenSet[str]]:
+    """Get the key of the recipes of a room for an unordered pair of items."""
+    return (room, frozenset((item1, item2)))
+
+
+class GameState:
+    """Indexed view of a Discape game.
+
+    Every read is served from these maps. Workbooks are only used to import
+    a game (``from_workbook``) and to export it (``to_workbook``). Removed
+    items and attractions stay in place as tombstones until the state is
+    exported or they outnumber the live entries of their room, when they are
+    compacted. Compaction rebinds fresh lists, so readers iterating the old
+    ones are unaffected; it runs inside the store transaction of the removal,
+    like exports.
+    """
+
+    def __init__(self):
+        """Initialize an empty game state."""
+        # Characters by Jugador cell, and by the ID of the user playing them
+        self.characters: Dict[str, Character] = {}
+        self.players: Dict[int, Character] = {}
+        self.stat_names: List[str] = []
+        self.stat_index: Dict[str, int] = {}
+        self.inventories: Dict[str, List[Item]] = {}
+        # Multiset of each room's inventory: room -> item name -> items
+        self.items_by_name: Dict[str, Dict[str, List[Item]]] = {}
+        self.combinations: List[Combination] = []
+        self.recipes: Dict[Tuple[str, FrozenSet[str]], Combination] = {}
+        # Removed items still in each room's inventory list
+        self.tombstones: Dict[str, int] = {}
+        self.rooms: Dict[str, RoomGraph] = {}
+
+    @classmethod
+    def from_workbook(cls, wb) -> "GameState":
+        """Build the game state from an openpyxl workbook."""
+        state = cls()
+
+        ws = wb[CHARACTERS_SHEET]
+        header = next(ws.iter_rows(max_row=1, values_only=True), ())
+        state.set_stat_names([name for name in header[CHAR_STATS_COL:] if name])
+        # Rows are padded to max_col, even in read-only mode
+        width = max(len(header), CHAR_STATS_COL)
+        for row_number, row in enumerate(
+            ws.iter_rows(min_row=2, max_col=width, values_only=True), start=2
+        ):
+            player = row[CHAR_USER_COL]
+            if player is None or str(player).strip() in state.characters:
+                continue
+            player = str(player).strip()
+            stats = [
+                value or 0
+                for name, value in zip(header[CHAR_STATS_COL:], row[CHAR_STATS_COL:])
+                if name
+            ]
+            stats += [0] * (len(state.stat_names) - len(stats))
+            state.add_character(
+                Character(
+                    row=row_number,
+                    name=row[CHAR_NAME_COL],
+                    player=player,
+                    room=row[CHAR_ROOM_COL],
+                    path=row[CHAR_PATH_COL],
+                    hand=row[CHAR_HAND_COL],
+                    stats=stats,
+                    player_id=parse_player_id(player),
+                )
+            )
+
+        for name, description, room in wb[INVENTORY_SHEET].iter_rows(
+            min_row=2, max_col=3, values_only=True
+        ):
+            if name is not None and room is not None:
+                state.add_item(Item(name, description, room))
+
+        for item1, item2, result, description, room in wb[COMBINATIONS_SHEET].iter_rows(
+            min_row=2, max_col=5, values_only=True
+        ):
+            if item1 is not None and item2 is not None:
+                state.add_combination(
+                    Combination(item1, item2, result, description, room)
+                )
+
+        for ws in wb.worksheets[FIRST_ROOM_SHEET:]:
+            state.rooms[ws.title] = RoomGraph(
+                Attraction(*row[:6])
+                for row in ws.iter_rows(min_row=2, max_col=6, values_only=True)
+                if row[0] is not None
+            )
+
+        return state
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "GameState":
+        """Rebuild a game state exported with ``to_dict``."""
+        state = cls()
+        state.set_stat_names(data["stat_names"])
+        for values in data["characters"]:
+            character = Character(**values)
+            character.stats = state.stat_vector(character.stats)
+            state.add_character(character)
+        for values in data["inventory"]:
+            state.add_item(Item(*values))
+        for values in data["combinations"]:
+            state.add_combination(Combination(**values))
+        for room, attractions in data["rooms"]:
+            state.rooms[room] = RoomGraph(Attraction(*values) for values in attractions)
+        return state
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Export the game state as JSON-serializable data."""
+        self.compact()
+        return {
+            "stat_names": self.stat_names,
+            "characters": [asdict(c) for c in self.characters.values()],
+            "inventory": [
+                [item.name, item.description, item.room, item.id]
+                for items in self.inventories.values()
+                for item in items
+            ],
+            "combinations": [asdict(recipe) for recipe in self.combinations],
+            "rooms": [
+                [
+                    room,
+                    [
+                        attraction.values() + [attraction.id]
+                        for attraction in graph.attractions
+                    ],
+                ]
+                for room, graph in self.rooms.items()
+            ],
+        }
+
+    def set_stat_names(self, names: List[str]) -> None:
+        """Set the stat names and index their positions in the stat vectors."""
+        self.stat_names = list(names)
+        self.stat_index = {name: index for index, name in enumerate(self.stat_names)}
+
+    def stat_vector(self, stats) -> List[int]:
+        """Convert stored stats, as a vector or a name -> value map, to a vector."""
+        if isinstance(stats, dict):
+            return [stats.get(name, 0) for name in self.stat_names]
+        return list(stats)
+
+    def stat(self, character: Character, stat: str) -> int:
+        """Get the value of a stat of a character, or 0 if it has no such stat."""
+        index = self.stat_index.get(stat)
+        return character.stats[index] if index is not None else 0
+
+    def room_stats(self, room: str, stat: str) -> List[Tuple[str, int]]:
+        """Get the name and stat value of every character inside a room."""
+        index = self.stat_index.get(stat)
+        return [
+            (character.name, character.stats[index] if index is not None else 0)
+            for character in self.players_in(room)
+        ]
+
+    def approximate_size(self) -> int:
+        """Estimate the memory used by the records of the game in bytes."""
+        records = [
+            *self.characters.values(),
+            *(item for items in self.inventories.values() for item in items),
+            *self.combinations,
+            *(a for graph in self.rooms.values() for a in graph.attractions),
+        ]
+        return sum(
+            sys.getsizeof(record)
+            + sum(sys.getsizeof(value) for value in vars(record).values())
+            for record in records
+        )
+
+    def compact(self) -> None:
+        """Drop the removed items and attractions from the lists."""
+        for graph in self.rooms.values():
+            graph.compact()
+        for room in list(self.tombstones):
+            self._compact_inventory(room)
+
+    def _compact_inventory(self, room: str) -> None:
+        """Drop the removed items from a room's inventory list."""
+        self.inventories[room] = [
+            item for item in self.inventories[room] if not item.removed
+        ]
+        self.tombstones.pop(room, None)
+
+    def add_character(self, character: Character) -> None:
+        """Add a character, indexing it by its user ID if it is bound."""
+        self.characters[character.player] = character
+        if character.player_id is not None:
+            self.players[character.player_id] = character
+
+    def character(self, player_id: int) -> Optional[Character]:
+        """Get the character played by the user with the given ID."""
+        return self.players.get(player_id)
+
+    def bind_player(self, character: Character, player_id: int) -> None:
+        """Bind a character to the ID of the user who plays it."""
+        if character.player_id is not None:
+            self.players.pop(character.player_id, None)
+        character.player_id = player_id
+        self.players[player_id] = character
+
+    def inventory(self, room: str) -> List[Item]:
+        """Get the shared inventory of a room."""
+        return [item for item in self.inventories.get(room, []) if not item.removed]
+
+    def add_item(self, item: Item) -> None:
+        """Add an item to the inventory of its room."""
+        self.inventories.setdefault(item.room, []).append(item)
+        self.items_by_name.setdefault(item.room, {}).setdefault(item.name, []).append(
+            item
+        )
+
+    def remove_item(self, item: Item) -> None:
+        """Remove an item from the inventory of its room, leaving a tombstone."""
+        item.removed = True
+        tombstones = self.tombstones.get(item.room, 0) + 1
+        self.tombstones[item.room] = tombstones
+        named = self.items_by_name[item.room]
+        named[item.name].remove(item)
+        if not named[item.name]:
+            del named[item.name]
+        if tombstones * 2 > len(self.inventories[item.room]):
+            self._compact_inventory(item.room)
+
+    def find_item(self, room: str, name: str) -> Optional[Item]:
+        """Get the first item with the given name in a room's inventory."""
+        items = self.items_by_name.get(room, {}).get(name)
+        return items[0] if items else None
+
+    def has_items(self, room: str, *names: str) -> bool:
+        """Check that a room's inventory holds all the given items."""
+        named = self.items_by_name.get(room, {})
+        return all(
+            len(named.get(name, ())) >= count for name, count in Counter(names).items()
+        )
+
+    def add_combination(self, recipe: Combination) -> None:
+        """Add a recipe; the first one for a pair of items takes precedence."""
+        self.combinations.append(recipe)
+        self.recipes.setdefault(_pair(recipe.room, recipe.item1, recipe.item2), recipe)
+
+    def recipe(self, room: str, item1: str, item2: str) -> Optional[Combination]:
+        """Get the recipe combining two items in a room, in either order."""
+        return self.recipes.get(_pair(room, item1, item2))
+
+    def room(self, room: str) -> Optional[RoomGraph]:
+        """Get the compiled attraction graph of a room."""
+        return self.rooms.get(room)
+
+    def players_in(self, room: str) -> List[Character]:
+        """Get the characters currently inside a room."""
+        return [c for c in self.characters.values() if c.room == room]
+
+    def to_workbook(self) -> Workbook:
+        """Export the game state as a new openpyxl workbook."""
+        self.compact()
+        wb = Workbook()
+
+        ws = wb.active
+        ws.title = CHARACTERS_SHEET
+        ws.append(CHARACTERS_HEADER + self.stat_names)
+        for character in sorted(self.characters.values(), key=lambda c: c.row):
+            ws.append(
+                [
+                    character.name,
+                    # Stored as text, as spreadsheets round IDs as numbers
+                    (
+                        character.player
+                        if character.player_id is None
+                        else str(character.player_id)
+                    ),
+                    character.room,
+                    character.path,
+                    character.hand,
+                ]
+                + character.stats
+            )
+
+        ws = wb.create_sheet(INVENTORY_SHEET)
+        ws.append(INVENTORY_HEADER)
+        for items in self.inventories.values():
+            for item in items:
+                ws.append([item.name, item.description, item.room])
+
+        ws = wb.create_sheet(COMBINATIONS_SHEET)
+        ws.append(COMBINATIONS_HEADER)
+        for recipe in self.combinations:
+            ws.append(
+                [
+                    recipe.item1,
+                    recipe.item2,
+                    recipe.result,
+                    recipe.description,
+                    recipe.room,
+                ]
+            )
+
+        for room, table in self.rooms.items():
+            ws = wb.create_sheet(room)
+            ws.append(ROOM_HEADER)
+            for attraction in table.attractions:
+                ws.append(attraction.values())
+
+        return wb
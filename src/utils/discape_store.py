@@ -0,0 +1,290 @@
+"""
+SQLite storage engine for the Discape module.
+Persists the game state row by row instead of rewriting the workbook.
+"""
+
+import json
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional
+
+from utils.discape_model import (
+    Attraction,
+    Character,
+    Combination,
+    GameState,
+    Item,
+    RoomGraph,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class DiscapeStore:
+    """Discape game state stored in an SQLite database in WAL mode."""
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS meta (
+        key text PRIMARY KEY,
+        value text NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS characters (
+        player text PRIMARY KEY,
+        row integer NOT NULL,
+        name text NULL,
+        room text NULL,
+        path text NULL,
+        hand text NULL,
+        stats text NOT NULL,
+        player_id integer NULL
+    );
+    CREATE INDEX IF NOT EXISTS characters_room ON characters(room);
+    CREATE TABLE IF NOT EXISTS inventory (
+        id integer PRIMARY KEY,
+        room text NOT NULL,
+        name text NOT NULL,
+        description text NULL
+    );
+    CREATE INDEX IF NOT EXISTS inventory_room ON inventory(room);
+    CREATE TABLE IF NOT EXISTS combinations (
+        id integer PRIMARY KEY,
+        room text NULL,
+        item1 text NOT NULL,
+        item2 text NOT NULL,
+        result text NULL,
+        description text NULL
+    );
+    CREATE INDEX IF NOT EXISTS combinations_items ON combinations(room, item1, item2);
+    CREATE TABLE IF NOT EXISTS rooms (
+        name text PRIMARY KEY,
+        position integer NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS attractions (
+        id integer PRIMARY KEY,
+        room text NOT NULL,
+        name text NOT NULL,
+        description text NULL,
+        depth text NULL,
+        path text NULL,
+        key text NULL,
+        action text NULL
+    );
+    CREATE INDEX IF NOT EXISTS attractions_room ON attractions(room, depth);
+    """
+
+    def __init__(self, db_path: str):
+        """Open the database and create the schema if needed."""
+        self.db_path = db_path
+        self._lock = threading.RLock()
+        # Called under the lock after a transaction is rolled back
+        self.on_rollback: Optional[Callable[[], None]] = None
+        self._conn = sqlite3.connect(
+            db_path, timeout=10.0, isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self.SCHEMA)
+        self._migrate()
+
+    def _migrate(self) -> None:
+        """Upgrade databases created before characters had a user ID."""
+        columns = {
+            row[1] for row in self._conn.execute("PRAGMA table_info(characters)")
+        }
+        if "player_id" not in columns:
+            self._conn.execute("ALTER TABLE characters ADD COLUMN player_id integer")
+            logger.info(f"Added player IDs to the characters of {self.db_path}")
+        self._conn.execute("""CREATE UNIQUE INDEX IF NOT EXISTS characters_player_id
+            ON characters(player_id)""")
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    @contextmanager
+    def transaction(self, action: Optional[str] = None, **details) -> Iterator[None]:
+        """Group the mutations of an action into a single commit."""
+        with self._lock:
+            if self._conn.in_transaction:
+                yield
+                return
+            self._conn.execute("BEGIN")
+            try:
+                yield
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                if self.on_rollback:
+                    self.on_rollback()
+                raise
+            self._conn.execute("COMMIT")
+
+    def _execute(self, sql: str, params=()) -> sqlite3.Cursor:
+        """Execute a statement, committing it unless inside a transaction."""
+        with self._lock:
+            return self._conn.execute(sql, params)
+
+    def import_state(self, state: GameState) -> None:
+        """Replace the stored game with the given game state."""
+        with self.transaction():
+            for table in (
+                "meta",
+                "characters",
+                "inventory",
+                "combinations",
+                "rooms",
+                "attractions",
+            ):
+                self._execute(f"DELETE FROM {table}")
+
+            self._execute(
+                "INSERT INTO meta(key, value) VALUES('stat_names', ?)",
+                (json.dumps(state.stat_names),),
+            )
+            for character in state.characters.values():
+                self._execute(
+                    """INSERT INTO characters(player, row, name, room, path, hand, stats,
+                        player_id)
+                    VALUES(?,?,?,?,?,?,?,?)""",
+                    (
+                        character.player,
+                        character.row,
+                        character.name,
+                        character.room,
+                        character.path,
+                        character.hand,
+                        json.dumps(character.stats),
+                        character.player_id,
+                    ),
+                )
+            for items in state.inventories.values():
+                for item in items:
+                    self.add_item(item)
+            for recipe in state.combinations:
+                self._execute(
+                    """INSERT INTO combinations(room, item1, item2, result, description)
+                    VALUES(?,?,?,?,?)""",
+                    (
+                        recipe.room,
+                        recipe.item1,
+                        recipe.item2,
+                        recipe.result,
+                        recipe.description,
+                    ),
+                )
+            for position, (room, table) in enumerate(state.rooms.items()):
+                self._execute(
+                    "INSERT INTO rooms(name, position) VALUES(?,?)", (room, position)
+                )
+                for attraction in table.attractions:
+                    cursor = self._execute(
+                        """INSERT INTO attractions(room, name, description, depth, path, key, action)
+                        VALUES(?,?,?,?,?,?,?)""",
+                        (room, *attraction.values()),
+                    )
+                    attraction.id = cursor.lastrowid
+
+        logger.info(f"Imported Discape game into {self.db_path}")
+
+    def load(self) -> Optional[GameState]:
+        """Load the stored game state, or None if no game was imported."""
+        with self._lock:
+            row = self._execute(
+                "SELECT value FROM meta WHERE key='stat_names'"
+            ).fetchone()
+            if row is None:
+                return None
+
+            state = GameState()
+            state.set_stat_names(json.loads(row[0]))
+
+            for (
+                player,
+                row_number,
+                name,
+                room,
+                path,
+                hand,
+                stats,
+                player_id,
+            ) in self._execute(
+                """SELECT player, row, name, room, path, hand, stats, player_id
+                FROM characters ORDER BY row"""
+            ):
+                state.add_character(
+                    Character(
+                        row=row_number,
+                        name=name,
+                        player=player,
+                        room=room,
+                        path=path,
+                        hand=hand,
+                        stats=state.stat_vector(json.loads(stats)),
+                        player_id=player_id,
+                    )
+                )
+
+            for item_id, room, name, description in self._execute(
+                "SELECT id, room, name, description FROM inventory ORDER BY id"
+            ):
+                state.add_item(Item(name, description, room, item_id))
+
+            for room, item1, item2, result, description in self._execute(
+                """SELECT room, item1, item2, result, description
+                FROM combinations ORDER BY id"""
+            ):
+                state.add_combination(
+                    Combination(item1, item2, result, description, room)
+                )
+
+            attractions = {}
+            for attraction_id, room, *values in self._execute(
+                """SELECT id, room, name, description, depth, path, key, action
+                FROM attractions ORDER BY id"""
+            ):
+                attractions.setdefault(room, []).append(
+                    Attraction(*values, id=attraction_id)
+                )
+            for (room,) in self._execute("SELECT name FROM rooms ORDER BY position"):
+                state.rooms[room] = RoomGraph(attractions.get(room, []))
+
+            return state
+
+    def update_character(self, character: Character) -> None:
+        """Persist the location, equipped item and user ID of a character."""
+        self._execute(
+            """UPDATE characters SET room = ?, path = ?, hand = ?, player_id = ?
+            WHERE player = ?""",
+            (
+                character.room,
+                character.path,
+                character.hand,
+                character.player_id,
+                character.player,
+            ),
+        )
+
+    def add_item(self, item: Item) -> None:
+        """Persist a new inventory item and assign its ID."""
+        cursor = self._execute(
+            "INSERT INTO inventory(room, name, description) VALUES(?,?,?)",
+            (item.room, item.name, item.description),
+        )
+        item.id = cursor.lastrowid
+
+    def remove_item(self, item: Item) -> None:
+        """Delete an inventory item."""
+        self._execute("DELETE FROM inventory WHERE id = ?", (item.id,))
+
+    def update_attraction(self, attraction: Attraction) -> None:
+        """Persist the key of an attraction."""
+        self._execute(
+            "UPDATE attractions SET key = ? WHERE id = ?",
+            (attraction.key, attraction.id),
+        )
+
+    def remove_attraction(self, attraction: Attraction) -> None:
+        """Delete an attraction."""
+        self._execute("DELETE FROM attractions WHERE id = ?", (attraction.id,))
@@ -0,0 +1,248 @@
+"""
+Validation and compilation of Discape workbooks.
+Checks an uploaded workbook once and caches the compiled game by file hash.
+"""
+
+import os
+import pickle
+import hashlib
+import logging
+from typing import Dict, List, Optional, Set
+from openpyxl import load_workbook
+
+from utils.discape_model import (
+    CHARACTERS_HEADER,
+    CHARACTERS_SHEET,
+    COMBINATIONS_HEADER,
+    COMBINATIONS_SHEET,
+    FIRST_ROOM_SHEET,
+    INVENTORY_HEADER,
+    INVENTORY_SHEET,
+    OBJECT,
+    PASSAGE,
+    PUZZLE,
+    ROOM_HEADER,
+    GameState,
+)
+from utils.puzzles import puzzle_registry
+
+logger = logging.getLogger(__name__)
+
+# Bump when the model classes change so older compiled games are rebuilt
+COMPILED_FORMAT = 2
+
+
+class InvalidWorkbookError(ValueError):
+    """Raised when a workbook does not describe a valid escape room."""
+
+    def __init__(self, errors: List[str]):
+        super().__init__("; ".join(errors))
+        self.errors = errors
+
+
+def file_hash(path: str) -> str:
+    """Get the SHA-256 hash of a file."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _normalize(value) -> str:
+    """Normalize a header cell for comparison."""
+    return str(value or "").strip().casefold()
+
+
+def _check_header(ws, expected: List[str], errors: List[str]) -> None:
+    """Check that a sheet starts with the expected header cells."""
+    header = next(ws.iter_rows(max_row=1, values_only=True), ())
+    header = list(header[: len(expected)]) + [None] * (len(expected) - len(header))
+    for column, (value, name) in enumerate(zip(header, expected), start=1):
+        if _normalize(value) != _normalize(name):
+            errors.append(
+                f'Hoja "{ws.title}": la columna {column} debe ser "{name}", '
+                f'no "{value or ""}".'
+            )
+
+
+def validate_workbook(wb) -> List[str]:
+    """
+    Check the structure of an escape room workbook.
+
+    Args:
+        wb: openpyxl workbook
+
+    Returns:
+        Human readable description of every problem found; empty if valid
+    """
+    errors = _validate_layout(wb)
+    if errors:
+        return errors
+    return validate_game(GameState.from_workbook(wb))
+
+
+def _validate_layout(wb) -> List[str]:
+    """Check the sheet order, the headers and the players of a workbook."""
+    errors: List[str] = []
+    for index, title in enumerate(
+        (CHARACTERS_SHEET, INVENTORY_SHEET, COMBINATIONS_SHEET)
+    ):
+        if len(wb.sheetnames) <= index or wb.sheetnames[index] != title:
+            errors.append(f'La hoja {index + 1} debe llamarse "{title}".')
+    if len(wb.sheetnames) <= FIRST_ROOM_SHEET:
+        errors.append("El archivo no tiene ninguna hoja de sala de huida.")
+    if errors:
+        return errors
+
+    _check_header(wb[CHARACTERS_SHEET], CHARACTERS_HEADER, errors)
+    _check_header(wb[INVENTORY_SHEET], INVENTORY_HEADER, errors)
+    _check_header(wb[COMBINATIONS_SHEET], COMBINATIONS_HEADER, errors)
+    for ws in wb.worksheets[FIRST_ROOM_SHEET:]:
+        _check_header(ws, ROOM_HEADER, errors)
+    if errors:
+        return errors
+
+    players: Set[str] = set()
+    for row_number, (player,) in enumerate(
+        wb[CHARACTERS_SHEET].iter_rows(
+            min_row=2, min_col=2, max_col=2, values_only=True
+        ),
+        start=2,
+    ):
+        if player is None:
+            continue
+        player = str(player).strip()
+        if player in players:
+            errors.append(f'Personajes, fila {row_number}: "{player}" está repetido.')
+        players.add(player)
+
+    return errors
+
+
+def validate_game(state: GameState) -> List[str]:
+    """Check that every room can be explored and every item obtained."""
+    errors: List[str] = []
+
+    # Items each room can ever hold: its initial inventory, the objects that
+    # can be picked up in it, the rewards of its puzzles and the results of
+    # its combinations
+    obtainable: Dict[Optional[str], Set[str]] = {}
+    for room, items in state.inventories.items():
+        obtainable.setdefault(room, set()).update(item.name for item in items)
+    for room, graph in state.rooms.items():
+        obtainable.setdefault(room, set()).update(
+            a.name for a in graph.attractions if a.kind == OBJECT
+        )
+        for attraction in graph.attractions:
+            if attraction.kind != PUZZLE:
+                continue
+            puzzle = puzzle_registry.get(attraction.puzzle)
+            if puzzle is None:
+                errors.append(
+                    f'Sala "{room}": el puzle "{attraction.puzzle}" de '
+                    f'"{attraction.name}" no existe.'
+                )
+            elif puzzle.reward:
+                obtainable[room].add(puzzle.reward[0])
+    for recipe in state.combinations:
+        if recipe.result is not None:
+            obtainable.setdefault(recipe.room, set()).add(recipe.result)
+
+    for room, graph in state.rooms.items():
+        reachable = {
+            a.target for a in graph.attractions if a.kind == PASSAGE and a.path
+        }
+        for attraction in graph.attractions:
+            if attraction.depth and attraction.depth not in reachable:
+                errors.append(
+                    f'Sala "{room}": ningún camino lleva a la profundidad '
+                    f'"{attraction.depth}" de "{attraction.name}".'
+                )
+            if attraction.key and attraction.key not in obtainable.get(room, ()):
+                errors.append(
+                    f'Sala "{room}": la llave "{attraction.key}" de '
+                    f'"{attraction.name}" no se puede conseguir en la sala.'
+                )
+
+    for recipe in state.combinations:
+        if recipe.room not in state.rooms:
+            errors.append(
+                f'Combinaciones: la sala "{recipe.room}" de '
+                f'"{recipe.item1}" + "{recipe.item2}" no existe.'
+            )
+            continue
+        if not recipe.result:
+            errors.append(
+                f'Combinaciones: "{recipe.item1}" + "{recipe.item2}" no tiene '
+                "resultado."
+            )
+        for item in (recipe.item1, recipe.item2):
+            if item not in obtainable[recipe.room]:
+                errors.append(
+                    f'Combinaciones: "{item}" no se puede conseguir en la sala '
+                    f'"{recipe.room}".'
+                )
+
+    return errors
+
+
+def compile_workbook(path: str, compiled_path: str) -> GameState:
+    """
+    Get the game described by a workbook, parsing it only if it changed.
+
+    A validated workbook is compiled into a pickled game state stored with
+    the hash of the file. Later imports of a file with the same hash load
+    that snapshot instead of parsing the workbook again; only the cheap
+    game checks run again, since they depend on the puzzle plugins.
+
+    Args:
+        path: Workbook file
+        compiled_path: File that caches the compiled game
+
+    Returns:
+        A fresh game state
+
+    Raises:
+        InvalidWorkbookError: If the workbook is not a valid escape room
+    """
+    digest = file_hash(path)
+    state = None
+    if os.path.exists(compiled_path):
+        try:
+            with open(compiled_path, "rb") as f:
+                compiled = pickle.load(f)
+            if compiled["format"] == COMPILED_FORMAT and compiled["hash"] == digest:
+                state = compiled["state"]
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable compiled game {compiled_path}: {e}")
+    if state is not None:
+        # The puzzle plugins may have changed since the game was compiled
+        errors = validate_game(state)
+        if errors:
+            raise InvalidWorkbookError(errors)
+        logger.info(f"Loaded compiled Discape game for {path}")
+        return state
+
+    # Read-only mode streams the sheets instead of loading every cell
+    wb = load_workbook(filename=path, read_only=True)
+    try:
+        errors = _validate_layout(wb)
+        if errors:
+            raise InvalidWorkbookError(errors)
+        state = GameState.from_workbook(wb)
+    finally:
+        wb.close()
+    errors = validate_game(state)
+    if errors:
+        raise InvalidWorkbookError(errors)
+
+    tmp_path = f"{compiled_path}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(
+            {"format": COMPILED_FORMAT, "hash": digest, "state": state},
+            f,
+            protocol=pickle.HIGHEST_PROTOCOL,
+        )
+    os.replace(tmp_path, compiled_path)
+    return state
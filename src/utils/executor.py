@@ -0,0 +1,122 @@
+"""
+Executor helpers for running blocking code off the asyncio event loop.
+"""
+
+import time
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Sequence
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class OperationStats:
+    """Latency counters for one kind of operation."""
+
+    count: int = 0
+    total_wait: float = 0.0
+    total_run: float = 0.0
+    max_run: float = 0.0
+
+    def as_dict(self) -> Dict[str, float]:
+        """Get the counters with averages in milliseconds."""
+        return {
+            "count": self.count,
+            "avg_wait_ms": self.total_wait / self.count * 1000 if self.count else 0,
+            "avg_run_ms": self.total_run / self.count * 1000 if self.count else 0,
+            "max_run_ms": self.max_run * 1000,
+        }
+
+
+class WorkerExecutor:
+    """Runs blocking calls on a fixed pool of worker threads.
+
+    Coroutines await ``run`` so the event loop never executes the call
+    itself. Queue depth and per-operation wait/run latency are recorded and
+    available through ``metrics``.
+    """
+
+    def __init__(self, name: str, workers: int = 1, slow_threshold: float = 0.5):
+        """
+        Create the executor.
+
+        Args:
+            name: Name prefix of the worker threads
+            workers: Number of worker threads
+            slow_threshold: Seconds after which an operation is logged as slow
+        """
+        self.name = name
+        self.slow_threshold = slow_threshold
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self._operations: Dict[str, OperationStats] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix=name
+        )
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run ``func(*args)`` on a worker thread and return its result."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._timed(func, args))
+
+    def call(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run ``func(*args)`` on a worker thread and wait for its result.
+
+        For synchronous code outside the worker threads, such as startup.
+        """
+        return self._executor.submit(self._timed(func, args)).result()
+
+    def _timed(
+        self, func: Callable[..., Any], args: Sequence[Any]
+    ) -> Callable[[], Any]:
+        """Queue a call, wrapped so that its wait and run time are recorded."""
+        with self._lock:
+            self.queue_depth += 1
+            self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+        submitted = time.perf_counter()
+
+        def call():
+            started = time.perf_counter()
+            try:
+                return func(*args)
+            finally:
+                self._record(func.__name__, started - submitted, started)
+
+        return call
+
+    def _record(self, operation: str, wait: float, started: float) -> None:
+        """Record the latency of a finished operation."""
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.queue_depth -= 1
+            stats = self._operations.setdefault(operation, OperationStats())
+            stats.count += 1
+            stats.total_wait += wait
+            stats.total_run += elapsed
+            stats.max_run = max(stats.max_run, elapsed)
+
+        if elapsed > self.slow_threshold:
+            logger.warning(
+                f"{self.name}: {operation} took {elapsed * 1000:.0f} ms "
+                f"({self.queue_depth} queued)"
+            )
+
+    def metrics(self) -> Dict[str, Any]:
+        """Get a snapshot of the queue depth and operation latencies."""
+        with self._lock:
+            return {
+                "queue_depth": self.queue_depth,
+                "max_queue_depth": self.max_queue_depth,
+                "operations": {
+                    name: stats.as_dict() for name, stats in self._operations.items()
+                },
+            }
+
+    def shutdown(self) -> None:
+        """Wait for queued operations and stop the worker threads."""
+        self._executor.shutdown(wait=True)
@@ -1,51 +1,146 @@
 """
 Puzzles utility for Discape module.
-Contains puzzle solving functions.
+Discovers puzzle plugins once and checks answers against precompiled solutions.
 """
 
+import os
+import re
+import hashlib
 import logging
+import threading
+import unicodedata
+import importlib.util
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Pattern, Sequence, Tuple
+
+from utils.config import config
+from utils.discape_model import Attraction
 
 logger = logging.getLogger(__name__)
 
 
-class PuzzlesSolver:
-    """Handles puzzle solving functionality."""
+def normalize_answer(answer: str) -> str:
+    """Normalize an answer: no accents, case or repeated whitespace."""
+    text = unicodedata.normalize("NFKD", str(answer))
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return " ".join(text.casefold().split())
+
+
+def hash_answer(answer: str) -> str:
+    """Get the SHA-256 hash of a normalized answer."""
+    return hashlib.sha256(normalize_answer(answer).encode("utf-8")).hexdigest()
+
+
+@dataclass
+class Puzzle:
+    """A puzzle plugin.
+
+    Plugins are modules in the puzzles directory that define ``PUZZLE``.
+    An answer is accepted if its normalized form is one of ``answers``, its
+    hash is one of ``answer_hashes`` (so the solution need not appear in the
+    plugin) or it matches ``pattern``. A puzzle without any of them only
+    shows its prompt.
+    """
+
+    name: str
+    prompt: str
+    answers: Sequence[str] = ()
+    answer_hashes: Sequence[str] = ()
+    pattern: Optional[str] = None
+    success: str = "¡Correcto!"
+    # Item name and description added to the room's inventory when solved
+    reward: Optional[Tuple[str, str]] = None
+    _hashes: frozenset = field(init=False, repr=False)
+    _regex: Optional[Pattern[str]] = field(init=False, repr=False)
+
+    def __post_init__(self):
+        """Compile the accepted answers."""
+        self._hashes = frozenset(self.answer_hashes) | {
+            hash_answer(answer) for answer in self.answers
+        }
+        self._regex = re.compile(self.pattern) if self.pattern else None
+
+    @property
+    def needs_answer(self) -> bool:
+        """Check whether the puzzle has to be answered to be solved."""
+        return bool(self._hashes or self._regex)
+
+    def check(self, answer: str) -> bool:
+        """Check an answer to the puzzle."""
+        if hash_answer(answer) in self._hashes:
+            return True
+        return bool(self._regex and self._regex.fullmatch(normalize_answer(answer)))
+
+
+@dataclass
+class PuzzleState:
+    """Puzzles being solved in one room."""
 
-    @staticmethod
-    def solve_puzzle(puzzle_name: str) -> str:
+    # Discord user ID of the player -> puzzle attraction they are answering
+    open: Dict[int, Attraction] = field(default_factory=dict)
+    # Puzzle attraction name -> wrong and right answers given
+    attempts: Counter = field(default_factory=Counter)
+
+
+class PuzzleRegistry:
+    """Puzzle plugins discovered once from a directory."""
+
+    def __init__(self, directory: str):
         """
-        Solve a puzzle by calling the appropriate function.
+        Create the registry.
 
         Args:
-            puzzle_name: Name of the puzzle to solve
-
-        Returns:
-            Result string from puzzle function
+            directory: Directory with one puzzle module per file
         """
-        try:
-            # Whitelist of allowed puzzle functions
-            puzzle_registry = {
-                "hola": PuzzlesSolver.hola,
-                # Add more puzzle functions here as needed
-            }
-            if not puzzle_name.replace("_", "").replace("-", "").isalnum():
-                logger.warning(f"Invalid puzzle name format: '{puzzle_name}'")
-                return "Nombre de puzzle inválido."
-
-            puzzle_func = puzzle_registry.get(puzzle_name)
-            if puzzle_func:
-                return puzzle_func()
-            else:
-                logger.warning(f"Puzzle function '{puzzle_name}' not found")
-                return f"Puzzle '{puzzle_name}' no encontrado."
-        except Exception as e:
-            logger.error(f"Error solving puzzle '{puzzle_name}': {e}")
-            return "Error al resolver el puzzle."
-
-    @staticmethod
-    def hola() -> str:
-        """Sample puzzle function."""
-        return "¡Hola!"
-
-    # Add more puzzle functions here as needed
-    # Each function should return a string result
+        self.directory = directory
+        self._puzzles: Optional[Dict[str, Puzzle]] = None
+        self._lock = threading.Lock()
+
+    def get(self, name: Optional[str]) -> Optional[Puzzle]:
+        """Get a puzzle by name, discovering the plugins on first use."""
+        if self._puzzles is None:
+            self.discover()
+        return self._puzzles.get(name) if name else None
+
+    def names(self):
+        """Get the names of the registered puzzles."""
+        if self._puzzles is None:
+            self.discover()
+        return sorted(self._puzzles)
+
+    def discover(self) -> None:
+        """Import every plugin in the directory and register its puzzle."""
+        with self._lock:
+            if self._puzzles is not None:
+                return
+
+            puzzles: Dict[str, Puzzle] = {}
+            files = os.listdir(self.directory) if os.path.isdir(self.directory) else []
+            for filename in sorted(files):
+                stem, extension = os.path.splitext(filename)
+                if extension != ".py" or stem.startswith("_"):
+                    continue
+                try:
+                    spec = importlib.util.spec_from_file_location(
+                        f"discape_puzzles.{stem}",
+                        os.path.join(self.directory, filename),
+                    )
+                    module = importlib.util.module_from_spec(spec)
+                    spec.loader.exec_module(module)
+                    puzzle = module.PUZZLE
+                except Exception as e:
+                    logger.error(f"Error loading puzzle plugin '{filename}': {e}")
+                    continue
+
+                if not puzzle.name.replace("_", "").replace("-", "").isalnum():
+                    logger.warning(f"Invalid puzzle name format: '{puzzle.name}'")
+                    continue
+                puzzles[puzzle.name] = puzzle
+
+            self._puzzles = puzzles
+            logger.info(f"Registered {len(puzzles)} puzzles from {self.directory}")
+
+
+# Registry shared by every Discape game
+puzzle_registry = PuzzleRegistry(config.DISCAPE_PUZZLES_DIR)
@@ -0,0 +1,177 @@
+"""
+Database layer for the quests module.
+Keeps one long-lived SQLite connection owned by a dedicated thread.
+"""
+
+import sqlite3
+import logging
+from contextlib import contextmanager
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Hashable,
+    Iterator,
+    Optional,
+    Sequence,
+    TypeVar,
+)
+
+from utils.executor import WorkerExecutor
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class QuestsDatabase:
+    """Quests database accessed from a single worker thread.
+
+    Coroutines await ``run`` with a function that uses ``execute`` and
+    ``transaction``, and synchronous code such as startup uses ``call``;
+    either way the function runs on the database thread, one at a time, so
+    the connection is never shared between concurrent calls.
+    """
+
+    PRAGMAS = (
+        "PRAGMA journal_mode=WAL",
+        # WAL is safe against corruption with NORMAL; only the last commits
+        # before a power loss can be lost
+        "PRAGMA synchronous=NORMAL",
+        "PRAGMA busy_timeout=10000",
+        "PRAGMA temp_store=MEMORY",
+        "PRAGMA cache_size=-8000",
+    )
+    # Prepared statements kept by the connection
+    CACHED_STATEMENTS = 64
+
+    def __init__(self, db_path: str):
+        """
+        Create the database layer. The connection is opened on first use.
+
+        Args:
+            db_path: Path of the SQLite database
+        """
+        self.db_path = db_path
+        self.executor = WorkerExecutor("quests-db")
+        self._conn: Optional[sqlite3.Connection] = None
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """Get the connection, opening it if needed."""
+        if self._conn is None:
+            self._conn = sqlite3.connect(
+                self.db_path,
+                timeout=10.0,
+                isolation_level=None,
+                check_same_thread=False,
+                cached_statements=self.CACHED_STATEMENTS,
+            )
+            for pragma in self.PRAGMAS:
+                self._conn.execute(pragma)
+            logger.info(f"Opened quests database {self.db_path}")
+        return self._conn
+
+    def execute(self, sql: str, params=()) -> sqlite3.Cursor:
+        """Execute a statement, committing it unless inside a transaction."""
+        return self.connection.execute(sql, params)
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """Group statements into a single commit."""
+        conn = self.connection
+        if conn.in_transaction:
+            yield
+            return
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def migrate(self, migrations: Sequence[Callable[["QuestsDatabase"], None]]) -> int:
+        """
+        Apply the migrations the database has not run yet.
+
+        The number of applied migrations is stored in ``PRAGMA user_version``.
+        Each migration runs in its own transaction together with the version
+        bump, so a failed migration leaves the database at the previous one.
+
+        Args:
+            migrations: Every migration in order, each a function of the database
+
+        Returns:
+            The schema version of the database
+        """
+        version = self.execute("PRAGMA user_version").fetchone()[0]
+        for number, migration in enumerate(migrations[version:], start=version + 1):
+            with self.transaction():
+                migration(self)
+                self.execute(f"PRAGMA user_version = {number}")
+            logger.info(f"Migrated {self.db_path} to version {number}")
+        return max(version, len(migrations))
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        """Run a function that uses the database on the database thread."""
+        return await self.executor.run(func, *args)
+
+    def call(self, func: Callable[..., T], *args: Any) -> T:
+        """Run a function that uses the database on the database thread and wait."""
+        return self.executor.call(func, *args)
+
+    def close(self) -> None:
+        """Wait for queued calls and close the connection."""
+        self.executor.shutdown()
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+class QuestsCache:
+    """Read-through cache of quest query results, kept by the event loop.
+
+    Entries are loaded on first read and dropped by ``invalidate`` when the
+    module writes to the rows they were read from. Every key has a version
+    bumped on invalidation, so a read that started before a write never
+    stores its outdated result. Only used from the event loop, so no lock
+    is needed.
+    """
+
+    def __init__(self):
+        """Create an empty cache."""
+        self.hits = 0
+        self.misses = 0
+        self._entries: Dict[Hashable, Any] = {}
+        self._versions: Dict[Hashable, int] = {}
+        self._epoch = 0
+
+    async def get(self, key: Hashable, load: Callable[[], Awaitable[T]]) -> T:
+        """Get the value cached under a key, loading it on a miss."""
+        if key in self._entries:
+            self.hits += 1
+            return self._entries[key]
+
+        self.misses += 1
+        version = (self._epoch, self._versions.get(key, 0))
+        value = await load()
+        if version == (self._epoch, self._versions.get(key, 0)):
+            self._entries[key] = value
+        return value
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop the value cached under a key."""
+        self._entries.pop(key, None)
+        self._versions[key] = self._versions.get(key, 0) + 1
+
+    def clear(self) -> None:
+        """Drop every cached value."""
+        self._entries.clear()
+        self._versions.clear()
+        self._epoch += 1
+
+    def metrics(self) -> Dict[str, int]:
+        """Get the hit and miss counters and the number of cached values."""
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
@@ -0,0 +1,61 @@
+"""
+Upload helpers.
+Streams Discord attachments to disk without holding them in memory.
+"""
+
+import os
+import logging
+import aiohttp
+import discord
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+
+
+class UploadTooLargeError(ValueError):
+    """Raised when an attachment exceeds the allowed size."""
+
+    def __init__(self, max_bytes: int):
+        super().__init__(f"Upload larger than {max_bytes} bytes")
+        self.max_bytes = max_bytes
+
+
+async def save_attachment(
+    attachment: discord.Attachment, path: str, max_bytes: int
+) -> int:
+    """
+    Stream an attachment to a file, aborting once it exceeds a size limit.
+
+    Args:
+        attachment: Discord attachment to download
+        path: Destination file; removed if the download fails
+        max_bytes: Maximum accepted size
+
+    Returns:
+        Number of bytes written
+
+    Raises:
+        UploadTooLargeError: If the attachment is larger than ``max_bytes``
+    """
+    if attachment.size > max_bytes:
+        raise UploadTooLargeError(max_bytes)
+
+    written = 0
+    try:
+        async with aiohttp.ClientSession() as session:
+            async with session.get(attachment.url) as response:
+                response.raise_for_status()
+                with open(path, "wb") as f:
+                    async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                        written += len(chunk)
+                        if written > max_bytes:
+                            raise UploadTooLargeError(max_bytes)
+                        f.write(chunk)
+    except BaseException:
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+
+    logger.debug(f"Saved {attachment.filename} to {path} ({written} bytes)")
+    return written